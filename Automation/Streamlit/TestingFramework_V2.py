@@ -1,23 +1,20 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import subprocess
 import json
-import time
 import os
+import sys
 import pandas as pd
 import re
-import csv
 import io
 from bs4 import BeautifulSoup
 from datetime import datetime
 from PIL import Image
 
+# The browser engine lives at the repository root (runner.py, parallel_runner.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from parallel_runner import build_jobs, run_jobs
+from run_log import RunLog, load_run_report, new_run_log_path, save_manifest
+
 TARGET_WIDTH_PX = 100
 TARGET_HEIGHT_PX = 100
 
@@ -92,202 +89,6 @@ def save_test_cases(test_cases):
     with open(TEST_CASES_FILE, "w") as file:
         json.dump(test_cases, file, indent=4)
 
-# Universal element finder
-def find_element(driver, selector_type, selector_value, index=0):
-    selectors = {
-        "id": By.ID,
-        "name": By.NAME,
-        "xpath": By.XPATH,
-        "css_selector": By.CSS_SELECTOR,
-        "class_name": By.CLASS_NAME,
-        "tag_name": By.TAG_NAME,
-        "link_text": By.LINK_TEXT,
-        "partial_link_text": By.PARTIAL_LINK_TEXT,
-        "placeholder": By.XPATH
-    }
-    if selector_type == "placeholder":
-        selector_value = f"//*[@placeholder='{selector_value}']"
-    elements = driver.find_elements(selectors[selector_type], selector_value)
-    if elements and index < len(elements):
-        return elements[index]
-    else:
-        raise Exception(f"No element found at index {index} for {selector_type}: {selector_value}")
-
-def substitute_placeholders(text, csv_row):
-    if not isinstance(text, str) or csv_row is None:
-        return text
-    placeholders = re.findall(r"\{\{(.*?)\}\}", text)
-    for placeholder in placeholders:
-        value = csv_row.get(placeholder) if isinstance(csv_row, (dict, pd.Series)) else None
-        text = text.replace(f"{{{{{placeholder}}}}}", str(value) if value and pd.notna(value) else '')
-    return text
-
-def capture_notification(driver):
-    try:
-        WebDriverWait(driver, 3).until(
-            EC.presence_of_all_elements_located(
-                (By.XPATH, "//*[contains(@class, 'Vue-Toastification__toast-body') or @role='alert' or contains(@class, 'el-form-item__error')]")
-            )
-        )
-        elements = driver.find_elements(By.XPATH, "//*[contains(@class, 'Vue-Toastification__toast-body') or @role='alert' or contains(@class, 'el-form-item__error')]")
-        notifications = [el.text.strip() for el in elements if el.text.strip()]
-        time.sleep(1)
-        for el in elements:
-            try:
-                close_buttons = driver.find_elements(By.CSS_SELECTOR, ".Vue-Toastification__close-button")
-                # Click each close button
-                for button in close_buttons:
-                    try:
-                        button.click()
-                    except Exception as e:
-                        print(f"Error clicking toast close button: {e}")
-                        time.sleep(0.5)
-            except:
-                pass
-        return notifications
-    except:
-        return []
-
-def run_test_case(test_case, headless=True, repeat=1, csv_row=None):
-    logs_output = []
-    for _ in range(repeat):
-        try:
-            options = EdgeOptions()
-            if headless:
-                options.add_argument("--headless=new")
-            options.add_argument("--incognito")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-cache")
-            # Automatically finds Microsoft Edge installed on Windows in its default path
-            driver = webdriver.Edge(service=EdgeService(), options=options)
-            driver.maximize_window()
-            driver.delete_all_cookies()
-            driver.refresh()
-            driver.refresh()  
-
-            for step in test_case["steps"]:
-                action = step["action"]
-                wait_time = step.get("wait", 0)
-                index = step.get("index", 0)
-                #driver.refresh()
-                step_log = {
-                    "action": action,
-                    "selector_type": step.get("selector_type", ""),
-                    "selector_value": step.get("selector_value", ""),
-                    "url": step.get("url", ""),
-                    "text": step.get("text", ""),
-                    "index": index,
-                    "wait_time": wait_time,
-                    "actual_url": "",
-                    "status": "",
-                    "notifications": []
-                }
-
-                if action == "visit":
-                    driver.refresh()
-                    expected_url = substitute_placeholders(step["url"], csv_row)
-                    driver.get(expected_url)
-                    time.sleep(1)
-                    actual_url = driver.current_url
-                    step_log["actual_url"] = actual_url
-                    step_log["status"] = "✅ Success" if expected_url.rstrip('/') == actual_url.rstrip('/') else "❌ No Access"
-                                    # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    notifications = capture_notification(driver)
-                    if notifications:
-                        step_log["notifications"] = notifications
-                        if any("success" in str(n).lower() for n in notifications):
-                            step_log["status"] = "✅ Success"
-                        else:
-                            step_log["status"] = "❌ Failed"
-
-                elif action == "click":
-                    find_element(driver, step["selector_type"], step["selector_value"], index).click()
-                    step_log["status"] = "✅ Clicked"
-                    time.sleep(0.5)                    
-                                                        # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    notifications = capture_notification(driver)
-                    if notifications:
-                        step_log["notifications"] = notifications
-                        if any("success" in str(n).lower() for n in notifications):
-                            step_log["status"] = "✅ Success"
-                        else:
-                            step_log["status"] = "❌ Failed"
-
-                elif action == "input":
-                    element = find_element(driver, step["selector_type"], step["selector_value"], index)
-                    element.clear()
-                    value = substitute_placeholders(step["text"], csv_row)
-                    element.send_keys(value)
-                                                        # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    step_log["status"] = f"✅ Input '{value}'"
-
-                elif action == "assert":
-                    value = substitute_placeholders(step["text"], csv_row)
-                    assert value in driver.page_source
-                                                        # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    step_log["status"] = f"✅ Asserted '{value}'"
-
-                elif action == "select_dropdown":
-                    dropdown = find_element(driver, step["selector_type"], step["selector_value"], index)
-                    dropdown.click()
-                                                        # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    time.sleep(1)
-
-                    expected_text = substitute_placeholders(step["text"], csv_row).strip()
-                    items = driver.find_elements(By.CSS_SELECTOR, "li.el-dropdown-menu__item")
-                    selected = False
-                    for item in items:
-                        if item.is_displayed() and item.text.strip() == expected_text:
-                            item.click()
-                            step_log["status"] = f"✅ Selected '{item.text.strip()}'"
-                            selected = True
-                            
-                            break
-                    if not selected:
-                        step_log["status"] = f"❌ Dropdown item '{expected_text}' not found"
-                                                        # Generate screenshot file path
-                    screenshot_filename = f"{SCREENSHOT_DIR}/step_{timestamp}_{action}_{int(time.time()*1000)}.png"
-                    driver.save_screenshot(screenshot_filename)
-                    step_log["screenshot"] = screenshot_filename
-                    notifications = capture_notification(driver)
-                    if notifications:
-                        step_log["notifications"] = notifications
-                        if any("success" in str(n).lower() for n in notifications):
-                            step_log["status"] = "✅ Success"
-                        else:
-                            step_log["status"] = "❌ Failed"
-
-                if csv_row is not None and "LoginEmail" in csv_row:
-                    step_log["LoginEmail"] = csv_row["LoginEmail"]
-                logs_output.append(step_log)
-                yield step_log  # 👈 YIELD instead of collecting in a list
-                if wait_time > 0:
-                    time.sleep(wait_time)
-
-            driver.quit()
-        except Exception as e:
-            logs_output.append({"status": f"❌ Error: {e}"})
-            try:
-                driver.quit()
-            except:
-                pass
-    return logs_output
-
 # Streamlit App
 st.set_page_config(layout="wide")
 st.title("Novellus Automation")
@@ -498,6 +299,7 @@ st.subheader("🚀 Run Tests")
 selected_cases = st.multiselect("Select Cases", [tc["name"] for tc in test_cases])
 repeat = st.number_input("Repeat Count", min_value=1, value=1)
 headless = st.checkbox("Run Headless", value=True)
+workers = st.number_input("Parallel Workers", min_value=1, value=1, help="Number of Edge browsers run side by side, one per worker process")
 
 st.subheader("📄 Load CSV Data")
 uploaded_file = st.file_uploader("Upload CSV", type=["csv"])
@@ -523,71 +325,57 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
-logs_output = []
 if st.button("▶️ Run Selected Tests"):
     st.subheader("📜 Live Logs")
 
-    total_runs = len(selected_cases) * repeat * (len(csv_data) if csv_data is not None else 1)
     progress_bar = st.progress(0)
     status_box = st.empty()
     log_container = st.container()
     completed = 0
 
-    for name in selected_cases:
-        test = next(tc for tc in test_cases if tc["name"] == name)
-        if csv_data is not None:
-            for idx, row in csv_data.iterrows():
-                user_id = row.get("LoginEmail", f"Row {idx+1}")
-                status_box.info(f"Running `{name}` for `{user_id}` ({completed+1}/{total_runs})")
-                logs = list(run_test_case(test, headless=headless, repeat=repeat, csv_row=row))
-                group_title = f"🧪 {name} | 👤 {user_id}"
-                with log_container.expander(group_title, expanded=False):
-                    for i, log in enumerate(logs):
-                        st.markdown(f"### 🔹 Step {i+1}: `{log.get('action', '').upper()}` - {log.get('status', 'Unknown')}")
-                        #st.markdown(f"**Selector Type:** `{log.get('selector_type', '')}`")
-                        #st.markdown(f"**Selector Value:** `{log.get('selector_value', '')}`")
-                        #st.markdown(f"**Text:** `{log.get('text', '')}`")
-                        #st.markdown(f"**Wait Time:** `{log.get('wait_time', '')}`")
-                        #st.markdown(f"**Actual URL:** `{log.get('actual_url', '')}`")
-                        if log.get("notifications"):
-                            st.markdown("**Notifications:**")
-                            st.write(log["notifications"])
-                        if log.get("screenshot") and os.path.exists(log["screenshot"]):
-                            st.image(log["screenshot"], caption="📸 Screenshot", use_container_width=True)
-                        st.markdown("---")
-
-                    logs_output.extend(logs)
-                completed += 1
-                progress_bar.progress(completed / total_runs)
-
-        else:
-            for r in range(repeat):
-                status_box.info(f"Running `{name}` ({completed+1}/{total_runs})")
-                logs = list(run_test_case(test, headless=headless, repeat=1))
-
-                for i, log in enumerate(logs):
-                    with log_container.expander(f"🔹 Step {i+1}: {log.get('action', '').upper()} - {log.get('status', 'Unknown')}"):
-                        st.markdown(f"**Selector Type:** `{log.get('selector_type', '')}`")
-                        st.markdown(f"**Selector Value:** `{log.get('selector_value', '')}`")
-                        st.markdown(f"**Text:** `{log.get('text', '')}`")
-                        st.markdown(f"**Wait Time:** `{log.get('wait_time', '')}`")
-                        st.markdown(f"**Actual URL:** `{log.get('actual_url', '')}`")
-                        if log.get("notifications"):
-                            st.markdown("**Notifications:**")
-                            st.write(log["notifications"])
-                        if log.get("screenshot") and os.path.exists(log["screenshot"]):
-                            st.image(log["screenshot"], caption="📸 Screenshot", use_container_width=True)
-
-                    logs_output.append(log)
-                    time.sleep(0.05)
-
-                completed += 1
-                progress_bar.progress(completed / total_runs)
+    jobs = build_jobs(test_cases, selected_cases, csv_data=csv_data, repeat=repeat)
+    file_base_name = "_".join(selected_cases).replace(" ", "_")
+    # Steps are shown and saved as they finish; the report is read back from the run file
+    run_log = RunLog(new_run_log_path(file_base_name))
+    save_manifest(run_log.path, jobs)
+    st.caption(f"📝 Streaming step logs to {run_log.path}")
+    job_expanders = {}
+    step_counts = {}
+
+    def job_title(job):
+        name = job["case"]["name"]
+        if job["csv_row"] is not None:
+            user_id = job["csv_row"].get("LoginEmail", f"Row {job['row_index']+1}")
+            return f"🧪 {name} | 👤 {user_id}"
+        return f"🧪 {name} | Run {job['repeat_index']+1}"
+
+    def stream_step(job_index, log):
+        run_log.append(job_index, dict(log, test_case=jobs[job_index]["case"]["name"]))
+        if job_index not in job_expanders:
+            job_expanders[job_index] = log_container.expander(job_title(jobs[job_index]), expanded=False)
+        step_counts[job_index] = step_counts.get(job_index, 0) + 1
+        with job_expanders[job_index]:
+            st.markdown(f"### 🔹 Step {step_counts[job_index]}: `{log.get('action', '').upper()}` - {log.get('status', 'Unknown')}")
+            if log.get("actual_url"):
+                st.markdown(f"**Actual URL:** `{log.get('actual_url', '')}`")
+            if log.get("notifications"):
+                st.markdown("**Notifications:**")
+                st.write(log["notifications"])
+            if log.get("screenshot") and os.path.exists(log["screenshot"]):
+                st.image(log["screenshot"], caption="📸 Screenshot", use_container_width=True)
+            st.markdown("---")
+
+    status_box.info(f"Running {len(jobs)} runs on {workers} {'worker' if workers == 1 else 'workers'}")
+    with run_log:
+        for job, logs in run_jobs(jobs, workers=workers, on_step=stream_step, headless=headless, browser="edge"):
+            completed += 1
+            progress_bar.progress(completed / len(jobs))
+            status_box.info(f"Finished `{job['case']['name']}` ({completed}/{len(jobs)})")
 
     progress_bar.empty()
     status_box.success("🎉 All tests completed!")
 
-    logs_df = pd.DataFrame(logs_output)
+    logs_df = load_run_report(run_log.path)
 
     if "LoginEmail" in logs_df.columns:
         cols = ["LoginEmail"] + [col for col in logs_df.columns if col != "LoginEmail"]
@@ -596,8 +384,6 @@ if st.button("▶️ Run Selected Tests"):
     st.write(logs_df)
 
     if not logs_df.empty:
-        file_base_name = "_".join(selected_cases).replace(" ", "_")
-
         # CSV EXPORT
         csv_bytes = logs_df.to_csv(index=False).encode("utf-8-sig")
         csv_filename = f"{file_base_name}_{timestamp}_logs.csv"
@@ -645,7 +431,7 @@ if st.button("▶️ Run Selected Tests"):
                             for row_num, path in enumerate(sheet_df["screenshot"], start=1):
                                 max_len = max(sheet_df[column].astype(str).map(len).max(),len(str(column)))
                                 worksheet.set_column(col_num, col_num, max_len + 2)                                            
-                                if os.path.exists(path):
+                                if isinstance(path, str) and os.path.exists(path):
                                     x_scale, y_scale = get_image_scale(path, 400, 200)
                                     worksheet.set_row(row_num, 153)
                                     worksheet.insert_image(row_num, col_num, path, {
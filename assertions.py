@@ -0,0 +1,85 @@
+from waits import wait_until
+
+# In-page assertion engine.
+# All assertions of an assert step are evaluated together in the browser,
+# against rendered (visible) text rather than the serialized page source, and
+# re-checked for up to ASSERT_TIMEOUT seconds while the page settles. Each
+# assertion's outcome is recorded in the step log; a failing assertion fails
+# the step without stopping the run.
+
+ASSERT_TIMEOUT = 2
+ASSERTION_TYPES = ["text_contains", "text_equals", "regex", "attribute", "value", "count"]
+# Longest "actual" value kept in the step log
+ACTUAL_LIMIT = 200
+
+# Each assertion: {"type", "expected", "selector_type"?, "selector_value"?,
+# "index"?, "attribute"?, "flags"?, "negate"?}. Without a selector the
+# assertion applies to the whole page body.
+ASSERTIONS_CONDITION = """
+var clean = function (s) { return String(s).replace(/\\s+/g, ' ').trim(); };
+var cut = function (s) {
+    if (s === null || s === undefined) { return s; }
+    s = String(s);
+    return s.length > args.limit ? s.slice(0, args.limit) + '...' : s;
+};
+var evaluate = function (a) {
+    var els = a.selector_value ? locate(a.selector_type || 'xpath', a.selector_value) : [document.body];
+    if (a.type === 'count') {
+        return { passed: els.length === Number(a.expected), actual: els.length };
+    }
+    var el = els[a.index || 0];
+    if (!el) { return { passed: false, actual: null, reason: els.length + ' matches' }; }
+    var text = clean(el.innerText || '');
+    switch (a.type) {
+        case 'text_contains': return { passed: text.indexOf(clean(a.expected)) !== -1, actual: text };
+        case 'text_equals': return { passed: text === clean(a.expected), actual: text };
+        case 'regex': return { passed: new RegExp(a.expected, a.flags || '').test(text), actual: text };
+        case 'attribute':
+            var value = el.getAttribute(a.attribute);
+            var passed = (a.expected === undefined || a.expected === null || a.expected === '')
+                ? value !== null : value === String(a.expected);
+            return { passed: passed, actual: value };
+        case 'value': return { passed: String(el.value) === String(a.expected), actual: el.value };
+        default: return { passed: false, actual: null, reason: 'unknown assertion type ' + a.type };
+    }
+};
+var results = [], allPassed = true;
+for (var i = 0; i < args.assertions.length; i++) {
+    var a = args.assertions[i], r;
+    try { r = evaluate(a); } catch (e) { r = { passed: false, actual: null, reason: 'error: ' + e.message }; }
+    if (a.negate && !r.reason) { r.passed = !r.passed; }
+    r.actual = cut(r.actual);
+    results.push(r);
+    if (!r.passed) { allPassed = false; }
+}
+return { ok: allPassed, value: results, reason: results };
+"""
+
+# The assertions a step asks for: its "text" (visible page text contains),
+# followed by any entries of its "assertions" list
+def step_assertions(step):
+    assertions = []
+    if step.get("text"):
+        assertions.append({"type": "text_contains", "expected": step["text"]})
+    assertions.extend(step.get("assertions") or [])
+    return assertions
+
+def describe_assertion(assertion):
+    target = assertion.get("selector_value") or "page"
+    if assertion.get("attribute"):
+        target += f"@{assertion['attribute']}"
+    negate = "not " if assertion.get("negate") else ""
+    return f"{target} {negate}{assertion.get('type')} '{assertion.get('expected', '')}'"
+
+# Evaluate assertions in one in-page poll; returns one result per assertion:
+# {"assertion", "passed", "actual"[, "reason"]}
+def run_assertions(driver, assertions, timeout=ASSERT_TIMEOUT):
+    if not assertions:
+        return []
+    args = {"assertions": assertions, "limit": ACTUAL_LIMIT}
+    outcome = wait_until(driver, ASSERTIONS_CONDITION, args=args, timeout=timeout)
+    results = outcome.get("value") if outcome.get("ok") else outcome.get("reason")
+    if not isinstance(results, list):
+        # The poll itself failed (e.g. the window closed); report it on every assertion
+        results = [{"passed": False, "actual": None, "reason": str(results)} for _ in assertions]
+    return [dict(result, assertion=describe_assertion(assertion)) for assertion, result in zip(assertions, results)]
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from runner import substitute_placeholders
+from waits import wait_for_page_ready
+from navigation import navigate
+
+# Authenticated session reuse for the login steps most cases start with.
+# The first run for a user performs the login and snapshots cookies plus
+# local/session storage; later runs for the same user restore that snapshot
+# and start at the first step after the login block.
+
+AUTH_DIR = "auth_sessions"
+# How far into a case the heuristic looks for the access-code submit click
+LOGIN_PREFIX_MAX = 8
+LOGIN_SUBMIT_IDS = ("kt_validate_access_code",)
+
+READ_STORAGE_JS = """
+var dump = function (store) {
+    var out = {};
+    for (var i = 0; i < store.length; i++) { var k = store.key(i); out[k] = store.getItem(k); }
+    return out;
+};
+return { local: dump(window.localStorage), session: dump(window.sessionStorage) };
+"""
+
+WRITE_STORAGE_JS = """
+var data = arguments[0];
+Object.keys(data.local).forEach(function (k) { window.localStorage.setItem(k, data.local[k]); });
+Object.keys(data.session).forEach(function (k) { window.sessionStorage.setItem(k, data.session[k]); });
+"""
+
+# Split a case into (login_steps, remaining_steps). Steps explicitly marked
+# "login": true win; otherwise a leading visit up to the access-code submit
+# click counts as the login block.
+def split_login_prefix(steps):
+    marked = 0
+    while marked < len(steps) and steps[marked].get("login"):
+        marked += 1
+    if marked:
+        return steps[:marked], steps[marked:]
+    if not steps or steps[0].get("action") != "visit":
+        return [], steps
+    for i, step in enumerate(steps[:LOGIN_PREFIX_MAX]):
+        if step.get("action") == "click" and step.get("selector_type") == "id" \
+                and step.get("selector_value") in LOGIN_SUBMIT_IDS:
+            return steps[:i + 1], steps[i + 1:]
+    return [], steps
+
+# Make a cookie from get_cookies() acceptable to add_cookie()
+def clean_cookie(cookie):
+    cookie = dict(cookie)
+    if "expiry" in cookie:
+        cookie["expiry"] = int(cookie["expiry"])
+    if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+        cookie.pop("sameSite", None)
+    return cookie
+
+# Same login steps with the same substituted values -> same session
+def login_key(login_steps, csv_row):
+    resolved = [
+        {k: substitute_placeholders(v, csv_row) for k, v in step.items()}
+        for step in login_steps
+    ]
+    return hashlib.sha1(json.dumps(resolved, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def is_login_page(url):
+    return "sign-in" in (url or "")
+
+class AuthCache:
+    def __init__(self, persist_dir=None, max_age=3600):
+        self.persist_dir = persist_dir
+        self.max_age = max_age
+        self.snapshots = {}
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def split(self, steps):
+        return split_login_prefix(steps)
+
+    def key_for(self, login_steps, csv_row):
+        return login_key(login_steps, csv_row)
+
+    # Snapshot the logged-in state of driver under key
+    def save(self, driver, key):
+        url = driver.current_url
+        if is_login_page(url):
+            return False
+        parts = urlsplit(url)
+        snapshot = {
+            "origin": f"{parts.scheme}://{parts.netloc}",
+            "landing_url": url,
+            "cookies": driver.get_cookies(),
+            "storage": driver.execute_script(READ_STORAGE_JS),
+            "saved_at": time.time(),
+        }
+        self.snapshots[key] = snapshot
+        if self.persist_dir:
+            with open(self._path(key), "w") as file:
+                json.dump(snapshot, file)
+        return True
+
+    # Put a saved session into driver; returns False if there is none or it no longer works
+    def restore(self, driver, key):
+        snapshot = self._load(key)
+        if snapshot is None:
+            return False
+        try:
+            driver.get(snapshot["origin"] + "/")
+            for cookie in snapshot["cookies"]:
+                driver.add_cookie(clean_cookie(cookie))
+            driver.execute_script(WRITE_STORAGE_JS, snapshot["storage"])
+            # A full load, so the app starts from the restored session even
+            # when the landing page only differs from the origin by its #route
+            navigate(driver, snapshot["landing_url"], hard_reload=True)
+            wait_for_page_ready(driver)
+            if is_login_page(driver.current_url):
+                self.forget(key)
+                return False
+            return True
+        except Exception as e:
+            print(f"Error restoring login session: {e}")
+            self.forget(key)
+            return False
+
+    def forget(self, key):
+        self.snapshots.pop(key, None)
+        if self.persist_dir and os.path.exists(self._path(key)):
+            try:
+                os.remove(self._path(key))
+            except Exception as e:
+                print(f"Error removing saved session: {e}")
+
+    def _load(self, key):
+        snapshot = self.snapshots.get(key)
+        if snapshot is None and self.persist_dir and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), "r") as file:
+                    snapshot = json.load(file)
+            except Exception as e:
+                print(f"Error reading saved session: {e}")
+                return None
+        if snapshot is None or self._expired(snapshot):
+            if snapshot is not None:
+                self.forget(key)
+            return None
+        self.snapshots[key] = snapshot
+        return snapshot
+
+    def _expired(self, snapshot):
+        now = time.time()
+        if self.max_age and now - snapshot["saved_at"] > self.max_age:
+            return True
+        # Any auth cookie past its expiry invalidates the whole snapshot
+        return any(c.get("expiry") and c["expiry"] <= now for c in snapshot["cookies"])
+
+    def _path(self, key):
+        return os.path.join(self.persist_dir, f"{key}.json")
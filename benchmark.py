@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from mock_app import ACCESS_CODE, LANDING_ROUTE, LISTING_ROWS, LISTINGS, MENU_ITEMS, start_mock_app
+from parallel_runner import build_jobs, run_jobs
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Throughput benchmark against the local mock app.
+# Runs a standard case x CSV row matrix through the normal job runner and
+# reports steps/sec, wall time and peak memory (this process plus its
+# browsers). Each result is appended to BENCHMARK_FILE with the git revision,
+# so numbers can be compared across versions:
+#     python benchmark.py --rows 20 --workers 4
+#     python benchmark.py --compare
+
+BENCHMARK_DIR = "benchmarks"
+BENCHMARK_FILE = f"{BENCHMARK_DIR}/results.jsonl"
+MEMORY_SAMPLE_SECONDS = 0.5
+
+def login_steps(base_url):
+    return [
+        {"action": "visit", "url": f"{base_url}/#/sign-in", "login": True},
+        {"action": "input", "selector_type": "placeholder", "selector_value": "Email", "text": "{{LoginEmail}}", "login": True},
+        {"action": "click", "selector_type": "id", "selector_value": "kt_sign_in_submit", "login": True},
+        {"action": "input", "selector_type": "name", "selector_value": "code", "text": "{{Password}}", "login": True},
+        {"action": "click", "selector_type": "id", "selector_value": "kt_validate_access_code", "login": True},
+    ]
+
+# The standard cases, shaped like the ones in test_cases.json
+def benchmark_cases(base_url):
+    return [
+        {"name": "Login", "steps": login_steps(base_url)},
+        {"name": "Listings", "steps": login_steps(base_url) + [
+            {"action": "visit", "url": f"{base_url}/dashboard#/{route}"} for route in LISTINGS
+        ]},
+        {"name": "Dropdown", "steps": login_steps(base_url) + [
+            {"action": "visit", "url": f"{base_url}/dashboard#/{LANDING_ROUTE}"},
+            {"action": "select_dropdown", "selector_type": "id", "selector_value": "listing-actions-dropdown",
+             "text": MENU_ITEMS[0]},
+            {"action": "assert", "text": "Deal 1", "assertions": [
+                {"type": "count", "selector_type": "css_selector", "selector_value": "tbody tr",
+                 "expected": LISTING_ROWS}
+            ]},
+        ]},
+    ]
+
+def benchmark_rows(rows):
+    return pd.DataFrame([{"LoginEmail": f"user{i + 1}@mock.test", "Password": ACCESS_CODE} for i in range(rows)])
+
+# Peak resident memory of this process and every descendant (browsers,
+# drivers, worker processes), sampled in the background
+class MemorySampler:
+    def __init__(self, interval=MEMORY_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _total_rss(self):
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _sample(self):
+        while True:
+            try:
+                self.peak = max(self.peak, self._total_rss())
+            except Exception:
+                pass
+            if self.stopped.wait(self.interval):
+                return
+
+    def __enter__(self):
+        if psutil is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        if psutil is not None:
+            self.thread.join()
+
+    def peak_mb(self):
+        return round(self.peak / 2 ** 20, 1) if self.peak else None
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run_benchmark(rows=10, repeat=1, workers=1, cases=None, latency_ms=150, jitter_ms=50, **options):
+    server, base_url = start_mock_app(latency_ms=latency_ms, jitter_ms=jitter_ms)
+    try:
+        test_cases = benchmark_cases(base_url)
+        selected = cases or [case["name"] for case in test_cases]
+        jobs = build_jobs(test_cases, selected, csv_data=benchmark_rows(rows), repeat=repeat)
+        steps = failures = 0
+        with MemorySampler() as memory:
+            started = time.perf_counter()
+            for job, logs in run_jobs(jobs, workers=workers, **options):
+                steps += len(logs)
+                failures += sum(1 for log in logs if str(log.get("status", "")).startswith("❌"))
+            wall = time.perf_counter() - started
+    finally:
+        server.shutdown()
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "cases": selected,
+        "rows": rows,
+        "repeat": repeat,
+        "workers": workers,
+        "latency_ms": latency_ms,
+        "options": options,
+        "jobs": len(jobs),
+        "steps": steps,
+        "failures": failures,
+        "wall_seconds": round(wall, 2),
+        "steps_per_second": round(steps / wall, 2) if wall else None,
+        "peak_memory_mb": memory.peak_mb(),
+    }
+
+def save_result(result, path=BENCHMARK_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+def load_results(path=BENCHMARK_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def print_comparison(results):
+    columns = ["timestamp", "revision", "rows", "workers", "jobs", "steps", "failures", "wall_seconds",
+               "steps_per_second", "peak_memory_mb"]
+    print(" | ".join(columns))
+    for result in results:
+        print(" | ".join(str(result.get(column, "")) for column in columns))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the runner against the local mock app")
+    parser.add_argument("--rows", type=int, default=10, help="CSV rows (one login user each)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cases", nargs="*", help="Case names (default: all standard cases)")
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--jitter-ms", type=int, default=50)
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "edge"])
+    parser.add_argument("--headed", action="store_true", help="Show the browsers")
+    parser.add_argument("--screenshots", default="on_failure", help="Screenshot mode for the run")
+    parser.add_argument("--no-reuse-sessions", action="store_true")
+    parser.add_argument("--reuse-logins", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Print stored results instead of running")
+    parser.add_argument("--last", type=int, default=10, help="How many stored results --compare shows")
+    args = parser.parse_args()
+
+    if args.compare:
+        print_comparison(load_results()[-args.last:])
+    else:
+        result = run_benchmark(rows=args.rows, repeat=args.repeat, workers=args.workers, cases=args.cases,
+                               latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, headless=not args.headed,
+                               browser=args.browser, screenshot_mode=args.screenshots,
+                               reuse_sessions=not args.no_reuse_sessions, reuse_logins=args.reuse_logins)
+        save_result(result)
+        print_comparison([result])
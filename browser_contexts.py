@@ -0,0 +1,200 @@
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+
+from runner import create_driver
+from waits import prepare_driver
+from notifications import install_notification_collector
+from load_profiles import apply_load_profile, debugger_address
+from memory import browser_rss_mb
+
+# Isolated browser contexts inside one browser process (Chrome/Edge).
+# One host browser is launched per pool. Every acquire() creates a fresh
+# DevTools browser context, which has its own cookies, storage and cache like
+# an incognito profile, and opens one page in it. The page is driven by a
+# WebDriver session attached to the host over its DevTools address. Several
+# sessions run jobs side by side (see parallel_runner.run_jobs_threaded), each in its own context,
+# for the memory of one browser plus a small driver process per session.
+# release() disposes the context, so a session never carries state from one
+# job to the next. The host is replaced after max_uses leases or once its
+# process tree grows past max_rss_mb: it takes no new leases until the running
+# ones are released, then restarts. Same interface as SessionPool.
+
+WINDOW_TIMEOUT = 5
+
+# A WebDriver session on the already running browser at address
+def attach_driver(address, browser="chrome"):
+    options = EdgeOptions() if browser == "edge" else Options()
+    options.debugger_address = address
+    if browser == "edge":
+        return webdriver.Edge(service=EdgeService(), options=options)
+    return webdriver.Chrome(options=options)
+
+# Window handle of a DevTools target, once the session has picked it up
+def window_for_target(driver, target_id, timeout=WINDOW_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        for handle in driver.window_handles:
+            if handle.upper().endswith(target_id.upper()):
+                return handle
+        if time.monotonic() >= deadline:
+            raise Exception(f"Browser context page {target_id} did not show up as a window")
+        time.sleep(0.05)
+
+class ContextPool:
+    def __init__(self, headless=True, browser="chrome", load_profile="full", max_uses=25, max_rss_mb=0):
+        self.headless = headless
+        self.browser = browser
+        self.load_profile = load_profile
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.host = None
+        self.address = None
+        self.window_size = None
+        self.uses = 0
+        self.leases = 0
+        self.idle = []
+        self.contexts = {}
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)
+
+    def _start_host(self):
+        self.host = create_driver(headless=self.headless, browser=self.browser, load_profile=self.load_profile)
+        self.address = debugger_address(self.host)
+        if not self.address:
+            self.host.quit()
+            self.host = None
+            raise Exception("The browser has no DevTools address; isolated contexts need Chrome or Edge")
+        self.window_size = self.host.get_window_size()
+        self.uses = 0
+
+    def _host_expired(self):
+        if self.max_uses and self.uses >= self.max_uses:
+            return True
+        if self.max_rss_mb:
+            rss = browser_rss_mb(self.host)
+            return rss is not None and rss > self.max_rss_mb
+        return False
+
+    # Called with the lock held and no leases out; sessions attached to the
+    # old host go with it
+    def _stop_host(self):
+        idle, self.idle = self.idle, []
+        host, self.host = self.host, None
+        for driver in idle:
+            self._quit(driver)
+        try:
+            host.quit()
+        except:
+            pass
+
+    # The host's DevTools commands are sent one at a time
+    def _host_command(self, command, params):
+        with self.lock:
+            if self.host is None:
+                raise Exception("The context pool's browser is closed")
+            return self.host.execute_cdp_cmd(command, params)
+
+    # A session switched to the page of a new, empty browser context
+    def acquire(self):
+        with self.lock:
+            while self.host is not None and self._host_expired():
+                if not self.leases:
+                    self._stop_host()
+                    break
+                self.released.wait()
+            if self.host is None:
+                self._start_host()
+            self.uses += 1
+            self.leases += 1
+            host = self.host
+        try:
+            context_id = self._host_command("Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+        except Exception:
+            self._end_lease()
+            raise
+        with self.lock:
+            driver = self.idle.pop() if self.idle else None
+        try:
+            target_id = self._host_command("Target.createTarget", {
+                "url": "about:blank",
+                "browserContextId": context_id,
+                "newWindow": True,
+                "width": self.window_size["width"],
+                "height": self.window_size["height"],
+            })["targetId"]
+            if driver is None:
+                driver = attach_driver(self.address, self.browser)
+            driver.switch_to.window(window_for_target(driver, target_id))
+            prepare_driver(driver)
+            install_notification_collector(driver)
+            if self.load_profile and self.load_profile != "full":
+                apply_load_profile(driver, self.load_profile)
+            # Memory is measured on the host's process tree (see memory.driver_pid)
+            driver.browser_host = host
+        except Exception:
+            self._dispose(context_id)
+            if driver is not None:
+                self._quit(driver)
+            self._end_lease()
+            raise
+        with self.lock:
+            self.contexts[id(driver)] = context_id
+        return driver
+
+    # Drop the job's context (and its page); keep the session for the next job
+    def release(self, driver):
+        with self.lock:
+            context_id = self.contexts.pop(id(driver), None)
+        if context_id is None or not self._dispose(context_id):
+            self._quit(driver)
+        else:
+            with self.lock:
+                self.idle.append(driver)
+        if context_id is not None:
+            self._end_lease()
+
+    def discard(self, driver):
+        with self.lock:
+            context_id = self.contexts.pop(id(driver), None)
+        if context_id is not None:
+            self._dispose(context_id)
+            self._end_lease()
+        self._quit(driver)
+
+    def _end_lease(self):
+        with self.lock:
+            self.leases -= 1
+            self.released.notify_all()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+            self.contexts = {}
+            host, self.host = self.host, None
+        # Attached sessions end without closing the browser; the host closes it
+        for driver in idle:
+            self._quit(driver)
+        if host is not None:
+            try:
+                host.quit()
+            except:
+                pass
+
+    def _dispose(self, context_id):
+        try:
+            self._host_command("Target.disposeBrowserContext", {"browserContextId": context_id})
+            return True
+        except Exception as e:
+            print(f"Error disposing browser context: {e}")
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except:
+            pass
@@ -0,0 +1,37 @@
+from waits import wait_until
+
+# Batched DOM queries.
+# Work that used to take one WebDriver round trip per element (is_displayed()
+# and .text on every menu item) is done in a single in-page call that returns
+# only the element handle to act on, or the reason nothing matched.
+
+# Element UI dropdown menus and Element Plus select popups
+MENU_ITEM_SELECTORS = "li.el-dropdown-menu__item, li.el-select-dropdown__item"
+MENU_TIMEOUT = 5
+# Options listed in a "not found" reason
+MENU_REASON_OPTIONS = 10
+
+MENU_ITEM_CONDITION = """
+var items = document.querySelectorAll(args.selectors);
+var options = [];
+for (var i = 0; i < items.length; i++) {
+    var item = items[i];
+    if (!isVisible(item) || item.classList.contains('is-disabled')) { continue; }
+    var text = (item.innerText || item.textContent || '').trim();
+    if (text === args.text) { return { ok: true, value: { element: item, text: text } }; }
+    options.push(text);
+}
+if (!options.length) { return { ok: false, reason: 'no open menu' }; }
+return {
+    ok: false,
+    reason: options.length + ' visible options: ' + options.slice(0, args.limit).join(' | ')
+        + (options.length > args.limit ? ' | ...' : '')
+};
+"""
+
+# Wait for an open dropdown/select menu and return {"ok": True, "value":
+# {"element", "text"}} for the visible item whose text is exactly text, or
+# {"ok": False, "reason": ...} listing what the menu offered instead
+def find_menu_item(driver, text, timeout=MENU_TIMEOUT):
+    args = {"selectors": MENU_ITEM_SELECTORS, "text": text, "limit": MENU_REASON_OPTIONS}
+    return wait_until(driver, MENU_ITEM_CONDITION, args=args, timeout=timeout)
@@ -0,0 +1,97 @@
+import hashlib
+import heapq
+import json
+import os
+
+# Job duration history and longest-first scheduling.
+# After every run each (case, CSV row) job's duration, the sum of its steps'
+# total_ms, is folded into a moving average stored in HISTORY_FILE. Before
+# the next parallel run the history estimates every job, jobs are handed to
+# workers longest first (LPT) so a long case no longer starts last and
+# stretches the tail, and the expected makespan is shown up front.
+
+HISTORY_FILE = "duration_history.json"
+# Weight of the newest run in the moving average
+SMOOTHING = 0.3
+# Estimate for a step of a case that has never run
+DEFAULT_STEP_SECONDS = 2.0
+
+def _row_key(csv_row):
+    if csv_row is None:
+        return ""
+    row = csv_row.to_dict() if hasattr(csv_row, "to_dict") else dict(csv_row)
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+def job_key(job):
+    return f"{job['case']['name']}|{_row_key(job['csv_row'])}"
+
+# Seconds spent in a job's steps, or None when its logs carry no timings
+def logged_seconds(logs):
+    timed = [log["total_ms"] for log in logs if isinstance(log.get("total_ms"), (int, float))]
+    return sum(timed) / 1000 if timed else None
+
+class DurationHistory:
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.jobs = {}
+        self.cases = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    saved = json.load(file)
+                self.jobs = saved.get("jobs", {})
+                self.cases = saved.get("cases", {})
+            except Exception as e:
+                print(f"Error reading duration history: {e}")
+
+    def known(self, job):
+        return job_key(job) in self.jobs
+
+    # Seconds: this job's history, else its case's, else a per-step default
+    def estimate(self, job):
+        key = job_key(job)
+        if key in self.jobs:
+            return self.jobs[key]
+        name = job["case"]["name"]
+        if name in self.cases:
+            return self.cases[name]
+        return len(job["case"]["steps"]) * DEFAULT_STEP_SECONDS
+
+    def record(self, job, logs):
+        seconds = logged_seconds(logs)
+        if seconds is None:
+            return
+        key = job_key(job)
+        name = job["case"]["name"]
+        self.jobs[key] = self._blend(self.jobs.get(key), seconds)
+        self.cases[name] = self._blend(self.cases.get(name), seconds)
+
+    @staticmethod
+    def _blend(previous, seconds):
+        if previous is None:
+            return round(seconds, 2)
+        return round(previous + SMOOTHING * (seconds - previous), 2)
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"jobs": self.jobs, "cases": self.cases}, file, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving duration history: {e}")
+
+# Job indices in the order workers should pick them up: longest estimate first
+def longest_first(jobs, history):
+    estimates = [history.estimate(job) for job in jobs]
+    return sorted(range(len(jobs)), key=lambda index: -estimates[index])
+
+# Expected wall time when jobs are taken in schedule order by workers that
+# each pick up the next job as soon as they are free
+def estimate_makespan(jobs, history, workers=1, schedule=None):
+    order = schedule if schedule is not None else range(len(jobs))
+    finish_times = [0.0] * max(int(workers), 1)
+    for index in order:
+        start = heapq.heappop(finish_times)
+        heapq.heappush(finish_times, start + history.estimate(jobs[index]))
+    return max(finish_times)
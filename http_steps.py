@@ -0,0 +1,87 @@
+import json
+import re
+import threading
+from urllib.parse import urljoin
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+# Backend requests for test-data setup and teardown.
+# An "http" step calls the app's API directly instead of clicking through
+# forms, signed in as the browser is: the browser's cookies are copied into a
+# requests.Session that each thread keeps for its whole life, so connections
+# to the app are reused. Values can be pulled out of a JSON response with a
+# JSON path and used as {{placeholders}} by later steps.
+#     {"action": "http", "method": "POST", "url": "/api/brokers",
+#      "body": {"name": "{{BrokerName}}"}, "expected_status": 201,
+#      "extract": {"BrokerId": "$.data.id"}}
+
+HTTP_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+HTTP_TIMEOUT = 30
+HTTP_POOL_SIZE = 10
+# Response text kept in the step log
+RESPONSE_LIMIT = 200
+MISSING_REQUESTS = "requests not installed (pip install requests)"
+
+_local = threading.local()
+
+def http_available():
+    return requests is not None
+
+def http_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+# Send a request with driver's cookies; a relative url is resolved against
+# the page the browser is on
+def send_request(driver, method, url, headers=None, body=None, timeout=HTTP_TIMEOUT):
+    if requests is None:
+        raise Exception(MISSING_REQUESTS)
+    session = http_session()
+    session.cookies.clear()
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    url = urljoin(driver.current_url, url)
+    if isinstance(body, (dict, list)):
+        return session.request(method, url, headers=headers, json=body, timeout=timeout)
+    return session.request(method, url, headers=headers, data=body or None, timeout=timeout)
+
+# $.data.items[0].id / $['key with spaces'] lookups into parsed JSON
+PATH_TOKEN_RE = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]|\[['\"]([^'\"]*)['\"]\]")
+
+def json_path(data, path):
+    if not path.startswith("$"):
+        raise ValueError(f"JSON path must start with '$': {path}")
+    position = 1
+    value = data
+    while position < len(path):
+        token = PATH_TOKEN_RE.match(path, position)
+        if token is None:
+            raise ValueError(f"Invalid JSON path at '{path[position:]}'")
+        key, item, quoted = token.groups()
+        try:
+            value = value[int(item)] if item is not None else value[key if key is not None else quoted]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"{path} not found in response")
+        position = token.end()
+    return value
+
+# Extracted values as placeholder text: JSON for objects and lists, nothing
+# for null; 0 and false are kept
+def variable_text(value):
+    if value is None:
+        return ""
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+def response_excerpt(response):
+    text = response.text or ""
+    return text if len(text) <= RESPONSE_LIMIT else text[:RESPONSE_LIMIT] + "…"
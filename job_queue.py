@@ -0,0 +1,264 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from screenshots import SCREENSHOT_DIR
+from parallel_runner import DEFAULT_RUN_OPTIONS
+from run_log import job_record
+
+# Shared job queue for worker daemons on several machines.
+# A single SQLite file on a share every node can reach holds the
+# (case, CSV row, repeat) jobs of each submitted run, the step logs that come
+# back, and the bytes of every screenshot those logs reference. The default
+# rollback journal is used (not WAL) because WAL does not work across hosts.
+
+# A running job whose worker has not reported for this long is handed out again
+LEASE_SECONDS = 300
+HEARTBEAT_SECONDS = 60
+POLL_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    job_index INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    logs TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id, status);
+CREATE TABLE IF NOT EXISTS screenshots (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+"""
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# CSV rows travel as plain dicts; substitute_placeholders accepts either
+def _job_payload(job, run_options):
+    return json.dumps({**job_record(job), "run_options": run_options}, default=str)
+
+class JobQueue:
+    def __init__(self, path):
+        self.path = path
+        self.connection = self._connect()
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def _connect(self):
+        # Autocommit; transactions are opened explicitly where claims must be atomic
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+
+    # Jobs are claimed in insertion order, which follows schedule when given
+    def submit(self, jobs, run_options, schedule=None):
+        run_id = uuid.uuid4().hex
+        order = schedule if schedule is not None else range(len(jobs))
+        rows = [(run_id, job_index, _job_payload(jobs[job_index], run_options)) for job_index in order]
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany("INSERT INTO jobs (run_id, job_index, payload) VALUES (?, ?, ?)", rows)
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return run_id
+
+    # Take the oldest queued job (or one whose lease ran out); returns
+    # (job_id, job, run_options) or None when there is nothing to do
+    def claim(self, worker):
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?) "
+                "ORDER BY id LIMIT 1", (now - LEASE_SECONDS,)).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (worker, now, row[0]))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        payload = json.loads(row[1])
+        run_options = payload.pop("run_options")
+        return row[0], payload, run_options
+
+    def heartbeat(self, job_id, worker):
+        self.connection.execute("UPDATE jobs SET claimed_at = ? WHERE id = ? AND worker = ?", (time.time(), job_id, worker))
+
+    # Store a finished job's logs and the screenshots they reference ({path: bytes});
+    # ignored when the lease was lost and the job was handed to another worker
+    def complete(self, job_id, worker, logs, screenshots):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute("SELECT run_id FROM jobs WHERE id = ? AND worker = ? AND status = 'running'",
+                                          (job_id, worker)).fetchone()
+            if row is None:
+                self.connection.execute("COMMIT")
+                return False
+            run_id = row[0]
+            self.connection.executemany("INSERT OR IGNORE INTO screenshots (run_id, path, data) VALUES (?, ?, ?)",
+                                        [(run_id, path, data) for path, data in screenshots.items()])
+            self.connection.execute("UPDATE jobs SET status = 'done', logs = ? WHERE id = ?",
+                                    (json.dumps(logs, default=str), job_id))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return True
+
+    # {job_index: logs} for jobs of run_id finished since the last call
+    def collect(self, run_id):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.connection.execute("SELECT job_index, logs FROM jobs WHERE run_id = ? AND status = 'done'",
+                                           (run_id,)).fetchall()
+            self.connection.execute("UPDATE jobs SET status = 'collected' WHERE run_id = ? AND status = 'done'",
+                                    (run_id,))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return {job_index: json.loads(logs) for job_index, logs in rows}
+
+    # {job_index: status} for the jobs of run_id not collected yet
+    def pending(self, run_id):
+        rows = self.connection.execute("SELECT job_index, status FROM jobs WHERE run_id = ? AND status != 'collected'",
+                                       (run_id,)).fetchall()
+        return dict(rows)
+
+    def screenshot(self, run_id, path):
+        row = self.connection.execute("SELECT data FROM screenshots WHERE run_id = ? AND path = ?",
+                                      (run_id, path)).fetchone()
+        return row[0] if row else None
+
+    # Drop a collected (or abandoned) run
+    def purge(self, run_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM jobs WHERE run_id = ?", (run_id,))
+            self.connection.execute("DELETE FROM screenshots WHERE run_id = ?", (run_id,))
+
+    def close(self):
+        self.connection.close()
+
+# Keeps a claimed job's lease fresh while a worker runs it
+class Heartbeat:
+    def __init__(self, queue, job_id, worker, interval=HEARTBEAT_SECONDS):
+        self.queue = JobQueue(queue.path)
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.queue.heartbeat(self.job_id, self.worker)
+            except Exception as e:
+                print(f"Error renewing job lease: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.queue.close()
+
+# Screenshots referenced by logs, read from this node's SCREENSHOT_DIR
+def collect_screenshots(logs):
+    found = {}
+    for log in logs:
+        path = log.get("screenshot")
+        if isinstance(path, str) and path and path not in found and os.path.exists(path):
+            with open(path, "rb") as file:
+                found[path] = file.read()
+    return found
+
+# Delete the files collect_screenshots read once the queue has their bytes
+def remove_screenshots(screenshots):
+    for path in screenshots:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Error deleting screenshot {path}: {e}")
+
+# Write a run's screenshots into the submitter's SCREENSHOT_DIR so the logs'
+# paths resolve locally
+def fetch_screenshots(queue, run_id, logs):
+    for log in logs:
+        path = log.get("screenshot")
+        if not isinstance(path, str) or not path or os.path.exists(path):
+            continue
+        data = queue.screenshot(run_id, path)
+        if data is not None:
+            # Worker slots keep their frames in subdirectories of SCREENSHOT_DIR
+            os.makedirs(os.path.dirname(path) or SCREENSHOT_DIR, exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+
+# Same contract as parallel_runner.run_jobs: submit every job to the queue at
+# queue_path and yield (job, logs) in job order as worker daemons finish them.
+# timeout (optional): seconds without any progress before the rest is given up
+# on_step (optional): called as on_step(job_index, log) once a job's logs arrive
+# schedule (optional): job indices in the order workers should claim them
+def run_distributed(jobs, queue_path, poll=POLL_SECONDS, timeout=None, on_step=None, schedule=None, **options):
+    queue = JobQueue(queue_path)
+    run_id = queue.submit(jobs, dict(DEFAULT_RUN_OPTIONS, **options), schedule=schedule)
+    ready = {}
+    position = 0
+    last_progress = time.monotonic()
+    try:
+        while position < len(jobs):
+            finished = queue.collect(run_id)
+            if finished:
+                ready.update(finished)
+                last_progress = time.monotonic()
+            while position in ready:
+                logs = ready.pop(position)
+                fetch_screenshots(queue, run_id, logs)
+                if on_step:
+                    for log in logs:
+                        on_step(position, log)
+                yield jobs[position], logs
+                position += 1
+            if position < len(jobs):
+                if timeout is not None and time.monotonic() - last_progress > timeout:
+                    pending = queue.pending(run_id)
+                    unclaimed = sum(1 for status in pending.values() if status == "queued")
+                    if unclaimed:
+                        print(f"{unclaimed} jobs of run {run_id} were never claimed; is a worker daemon polling {queue_path}?")
+                    for job_index in range(position, len(jobs)):
+                        if job_index in ready:
+                            logs = ready.pop(job_index)
+                            fetch_screenshots(queue, run_id, logs)
+                        elif pending.get(job_index) == "queued":
+                            logs = [{"status": f"❌ Error: no worker claimed the job within {timeout}s"}]
+                        else:
+                            logs = [{"status": f"❌ Error: no worker finished the job within {timeout}s"}]
+                        if on_step:
+                            for log in logs:
+                                on_step(job_index, log)
+                        yield jobs[job_index], logs
+                    return
+                time.sleep(poll)
+    finally:
+        queue.purge(run_id)
+        queue.close()
@@ -0,0 +1,134 @@
+import json
+import threading
+import weakref
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+# Resource-blocking load profiles.
+# A profile names the resource types (DevTools Network.ResourceType) and URL
+# patterns (DevTools wildcards) the browser never fetches, so functional runs
+# skip fonts, media, images and third-party trackers they never look at.
+# Matching requests are intercepted with the Fetch domain over a DevTools
+# websocket of the driver's page (needs websocket-client) and either failed or,
+# for "stub" profiles, answered with an empty 200 response so scripts that
+# wait on them carry on. The interceptor counts what it blocked, which each
+# step reads. Without websocket-client the URL patterns (plus file extensions
+# for the resource types) are blocked with Network.setBlockedURLs instead,
+# and nothing is counted.
+
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*", "*clarity.ms*",
+    "*connect.facebook.net*", "*segment.io*", "*nr-data.net*", "*js-agent.newrelic.com*", "*sentry.io*",
+]
+FONT_PATTERNS = ["*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+MEDIA_PATTERNS = ["*.mp4*", "*.webm*", "*.mp3*", "*.wav*", "*.ogg*"]
+IMAGE_PATTERNS = ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"]
+# URL patterns standing in for a resource type when it can't be intercepted
+TYPE_PATTERNS = {"Font": FONT_PATTERNS, "Media": MEDIA_PATTERNS, "Image": IMAGE_PATTERNS}
+
+LOAD_PROFILES = {
+    "full": {},
+    "no_trackers": {"urls": TRACKER_PATTERNS},
+    "functional": {"urls": TRACKER_PATTERNS, "types": ["Font", "Media"]},
+    "minimal": {"urls": TRACKER_PATTERNS, "types": ["Font", "Media", "Image"]},
+    "functional_stub": {"urls": TRACKER_PATTERNS, "types": ["Font", "Media"], "stub": True},
+    "minimal_stub": {"urls": TRACKER_PATTERNS, "types": ["Font", "Media", "Image"], "stub": True},
+}
+
+# Interceptors of the drivers that have one
+_blockers = weakref.WeakKeyDictionary()
+
+def profile_settings(profile):
+    return LOAD_PROFILES.get(profile or "full", {})
+
+def debugger_address(driver):
+    capabilities = driver.capabilities
+    options = capabilities.get("goog:chromeOptions") or capabilities.get("ms:edgeOptions") or {}
+    return options.get("debuggerAddress")
+
+# Fetch.requestPaused handler for one page, on its own DevTools connection
+class RequestBlocker:
+    def __init__(self, socket_url, settings):
+        self.socket = websocket.create_connection(socket_url, suppress_origin=True)
+        self.stub = settings.get("stub", False)
+        self.blocked = 0
+        self.message_id = 0
+        self.lock = threading.Lock()
+        patterns = [{"urlPattern": pattern, "requestStage": "Request"} for pattern in settings.get("urls", [])]
+        patterns += [{"resourceType": kind, "requestStage": "Request"} for kind in settings.get("types", [])]
+        self._send("Fetch.enable", {"patterns": patterns})
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _send(self, method, params):
+        with self.lock:
+            self.message_id += 1
+            self.socket.send(json.dumps({"id": self.message_id, "method": method, "params": params}))
+
+    # Runs until the page (or the browser) goes away
+    def _serve(self):
+        while True:
+            try:
+                message = json.loads(self.socket.recv())
+                if message.get("method") != "Fetch.requestPaused":
+                    continue
+                request_id = message["params"]["requestId"]
+                if self.stub:
+                    self._send("Fetch.fulfillRequest", {"requestId": request_id, "responseCode": 200, "body": ""})
+                else:
+                    self._send("Fetch.failRequest", {"requestId": request_id, "errorReason": "BlockedByClient"})
+            except Exception:
+                return
+            with self.lock:
+                self.blocked += 1
+
+    # Requests blocked since the previous call
+    def take_count(self):
+        with self.lock:
+            blocked, self.blocked = self.blocked, 0
+        return blocked
+
+    def close(self):
+        try:
+            self._send("Fetch.disable", {})
+            self.socket.close()
+        except Exception:
+            pass
+
+def _start_blocker(driver, settings):
+    address = debugger_address(driver)
+    if websocket is None or not address:
+        return None
+    target_id = driver.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+    return RequestBlocker(f"ws://{address}/devtools/page/{target_id}", settings)
+
+# Block profile's resources in driver from now on; "full" lifts any blocking
+def apply_load_profile(driver, profile):
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return
+    blocker = _blockers.pop(driver, None)
+    if blocker is not None:
+        blocker.close()
+    settings = profile_settings(profile)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        if not settings:
+            return
+        blocker = _start_blocker(driver, settings)
+        if blocker is not None:
+            _blockers[driver] = blocker
+            return
+        print(f"Load profile '{profile}' blocks by URL only (install websocket-client to block by resource type)")
+        patterns = settings.get("urls", []) + [p for kind in settings.get("types", []) for p in TYPE_PATTERNS[kind]]
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print(f"Error applying load profile '{profile}': {e}")
+
+# Requests blocked since the previous call, or None when driver has no interceptor
+def count_blocked_requests(driver):
+    blocker = _blockers.get(driver)
+    return blocker.take_count() if blocker is not None else None
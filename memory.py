@@ -0,0 +1,87 @@
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Memory accounting for long runs (needs psutil; without it nothing is
+# measured and nothing is throttled).
+# - Step logs get the resident memory of the browser (its driver process and
+#   every browser process below it) and of this runner process, plus the peak
+#   of the two together so far in the run.
+# - SessionPool recycles a browser whose process tree has grown past
+#   recycle_above_mb instead of handing it out again; ContextPool does the
+#   same for its shared host browser.
+# - Before a job opens a browser it waits while the host has less than
+#   min_free_memory_mb available, so parallel workers don't push it into swap.
+
+MB = 2 ** 20
+# How often a throttled job re-checks free memory, and for how long at most
+GOVERNOR_POLL_SECONDS = 2
+GOVERNOR_MAX_WAIT = 300
+
+# A session attached to a shared browser (browser_contexts) has a driver
+# process with no browser below it; it is measured through the host's driver
+def driver_pid(driver):
+    driver = getattr(driver, "browser_host", None) or driver
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    return getattr(process, "pid", None)
+
+# Resident memory of pid and all of its descendants, in bytes
+def tree_rss(pid):
+    if psutil is None or pid is None:
+        return None
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    except psutil.Error:
+        return None
+
+def browser_rss_mb(driver):
+    rss = tree_rss(driver_pid(driver))
+    return round(rss / MB, 1) if rss is not None else None
+
+def runner_rss_mb():
+    if psutil is None:
+        return None
+    return round(psutil.Process().memory_info().rss / MB, 1)
+
+def available_mb():
+    if psutil is None:
+        return None
+    return psutil.virtual_memory().available / MB
+
+# Block while the host is short of memory; gives up after max_wait seconds
+def wait_for_free_memory(min_free_mb, max_wait=GOVERNOR_MAX_WAIT):
+    if not min_free_mb or psutil is None:
+        return 0
+    started = time.monotonic()
+    while available_mb() < min_free_mb:
+        if time.monotonic() - started >= max_wait:
+            print(f"Free memory still below {min_free_mb} MB after {max_wait}s; starting the job anyway")
+            break
+        time.sleep(GOVERNOR_POLL_SECONDS)
+    return time.monotonic() - started
+
+# Memory columns for the step logs of one run on driver
+class RunMemory:
+    def __init__(self, driver):
+        self.driver = driver
+        self.peak = None
+
+    def sample(self):
+        if psutil is None:
+            return {}
+        browser = browser_rss_mb(self.driver)
+        runner = runner_rss_mb()
+        total = round((browser or 0) + runner, 1)
+        self.peak = total if self.peak is None else max(self.peak, total)
+        return {"browser_rss_mb": browser, "runner_rss_mb": runner, "peak_rss_mb": self.peak}
@@ -0,0 +1,240 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Local stand-in for the Lending Dynamics app, for benchmarks and offline runs.
+# A small hash-routed single page app with the pieces our steps rely on: the
+# sign-in and access-code forms (kt_sign_in_submit / kt_validate_access_code),
+# listing pages behind an XHR with an el-loading-mask, el-dropdown-menu__item
+# menus and Vue-Toastification toasts. Every API call waits latency_ms (plus
+# up to jitter_ms) so page-ready waits behave like they do against QA.
+#     python mock_app.py --port 8765 --latency-ms 150
+
+ACCESS_CODE = "747982"
+LISTING_ROWS = 25
+
+LISTINGS = {
+    "case-manager/deals-listing": ("Deals", "cases-cases-listing-add-case"),
+    "user-management/users-listing": ("Users", "users-users-listing-add-new-user"),
+    "user-management/introducers-listing": ("Introducers", "users-introducers-listing-add-new-introducer"),
+    "user-management/client-individual-listing": ("Individual Clients", "users-client-individual-listing-add-new"),
+    "user-management/client-companies-listing": ("Client Companies", "users-client-companies-listing-add-new"),
+    "user-management/client-group-listing": ("Client Groups", "users-client-group-listing-add-new"),
+    "user-management/brokers/brokers-listing": ("Brokers", "users-brokers-listing-add-new-brokers"),
+    "user-management/brokers/brokers-agents-listing": ("Broker Agents", "users-brokers-agents-listing-add-new"),
+    "system/settings/notification-rules-listing": ("Notification Rules", "system-notification-rules-add-new"),
+}
+LANDING_ROUTE = "case-manager/deals-listing"
+MENU_ITEMS = ["Export", "Archive", "Refresh", "Assign Owner"]
+
+PAGE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Lending Dynamics (mock)</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+#app { padding: 24px; position: relative; min-height: 400px; }
+.el-loading-mask { position: absolute; inset: 0; background: rgba(255,255,255,.8); }
+.el-dropdown { position: relative; display: inline-block; }
+.el-dropdown-menu { position: absolute; list-style: none; margin: 0; padding: 4px 0; background: #fff; border: 1px solid #ddd; }
+.el-dropdown-menu__item { padding: 4px 16px; cursor: pointer; }
+.Vue-Toastification__container { position: fixed; top: 8px; right: 8px; }
+.Vue-Toastification__toast { background: #333; color: #fff; padding: 8px 12px; margin-bottom: 4px; }
+table { border-collapse: collapse; margin-top: 12px; }
+td, th { border: 1px solid #ccc; padding: 2px 8px; }
+</style>
+</head>
+<body>
+<div id="app"></div>
+<div class="Vue-Toastification__container"></div>
+<script>
+var LISTINGS = __LISTINGS__, LANDING = "__LANDING__", MENU_ITEMS = __MENU_ITEMS__;
+var app = document.getElementById('app');
+
+function api(path, body) {
+    var mask = document.createElement('div');
+    mask.className = 'el-loading-mask';
+    app.appendChild(mask);
+    return fetch('/api/' + path, { method: 'POST', credentials: 'same-origin', body: JSON.stringify(body || {}) })
+        .then(function (r) { return r.json(); })
+        .finally(function () { mask.remove(); });
+}
+
+function toast(text) {
+    var el = document.createElement('div');
+    el.className = 'Vue-Toastification__toast';
+    el.innerHTML = '<div class="Vue-Toastification__toast-body"></div><button class="Vue-Toastification__close-button">x</button>';
+    el.firstChild.textContent = text;
+    el.lastChild.onclick = function () { el.remove(); };
+    document.querySelector('.Vue-Toastification__container').appendChild(el);
+    setTimeout(function () { el.remove(); }, 5000);
+}
+
+function signIn() {
+    app.innerHTML = '<h2>Sign In</h2><input placeholder="Email"> <button id="kt_sign_in_submit">Continue</button>';
+    document.getElementById('kt_sign_in_submit').onclick = function () {
+        var email = app.querySelector('[placeholder="Email"]').value;
+        api('sign-in', { email: email }).then(function (r) {
+            if (!r.ok) { return toast(r.message); }
+            app.innerHTML = '<h2>Access Code</h2><input name="code"> <button id="kt_validate_access_code">Verify</button>';
+            document.getElementById('kt_validate_access_code').onclick = function () {
+                api('validate', { email: email, code: app.querySelector('[name="code"]').value }).then(function (r) {
+                    toast(r.message);
+                    if (r.ok) {
+                        localStorage.setItem('token', r.token);
+                        // Client-side navigation, like the real app: no reload
+                        history.pushState(null, '', '/dashboard#/' + LANDING);
+                        render();
+                    }
+                });
+            };
+        });
+    };
+}
+
+function listing(route) {
+    var page = LISTINGS[route];
+    app.innerHTML = '<h2>' + page[0] + '</h2>'
+        + '<button id="' + page[1] + '">Add New</button> '
+        + '<div class="el-dropdown"><button id="listing-actions-dropdown">Actions</button></div>'
+        + '<table><thead><tr><th>#</th><th>Name</th><th>Status</th></tr></thead><tbody></tbody></table>';
+    document.getElementById(page[1]).onclick = function () { toast('Form opened'); };
+    document.getElementById('listing-actions-dropdown').onclick = function () {
+        var menu = document.createElement('ul');
+        menu.className = 'el-dropdown-menu';
+        MENU_ITEMS.forEach(function (label) {
+            var item = document.createElement('li');
+            item.className = 'el-dropdown-menu__item';
+            item.textContent = label;
+            item.onclick = function () {
+                menu.remove();
+                api('action', { route: route, action: label }).then(function (r) { toast(r.message); });
+            };
+            menu.appendChild(item);
+        });
+        this.parentNode.appendChild(menu);
+    };
+    api('list', { route: route }).then(function (r) {
+        if (!r.ok) { return signIn(); }
+        var body = app.querySelector('tbody');
+        r.rows.forEach(function (row) {
+            var tr = document.createElement('tr');
+            tr.innerHTML = '<td></td><td></td><td></td>';
+            tr.children[0].textContent = row.id;
+            tr.children[1].textContent = row.name;
+            tr.children[2].textContent = row.status;
+            body.appendChild(tr);
+        });
+    });
+}
+
+function render() {
+    var route = location.hash.replace(/^#\\/?/, '');
+    if (!localStorage.getItem('token')) {
+        if (route !== 'sign-in') { history.replaceState(null, '', '/#/sign-in'); }
+        return signIn();
+    }
+    if (route === 'sign-in') { return signIn(); }
+    listing(LISTINGS[route] ? route : LANDING);
+}
+window.addEventListener('hashchange', render);
+render();
+</script>
+</body>
+</html>
+"""
+
+def render_page():
+    return (PAGE_HTML
+            .replace("__LISTINGS__", json.dumps(LISTINGS))
+            .replace("__LANDING__", LANDING_ROUTE)
+            .replace("__MENU_ITEMS__", json.dumps(MENU_ITEMS)))
+
+class MockAppHandler(BaseHTTPRequestHandler):
+    # Set per server by make_server
+    latency_ms = 0
+    jitter_ms = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type, headers=()):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _signed_in(self):
+        return "ld_session=" in (self.headers.get("Cookie") or "")
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/favicon.ico":
+            return self._send(404, "", "text/plain")
+        self._send(200, render_page(), "text/html; charset=utf-8")
+
+    def do_POST(self):
+        time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        path = urlsplit(self.path).path
+        headers = []
+        if path == "/api/sign-in":
+            ok = "@" in str(body.get("email", ""))
+            result = {"ok": ok, "message": "" if ok else "Please enter a valid email address"}
+        elif path == "/api/validate":
+            ok = str(body.get("code", "")).strip() == ACCESS_CODE
+            result = {"ok": ok, "message": "Login successful" if ok else "Invalid access code"}
+            if ok:
+                result["token"] = f"mock-{random.getrandbits(64):016x}"
+                headers.append(("Set-Cookie", f"ld_session={result['token']}; Path=/"))
+        elif path == "/api/list":
+            if not self._signed_in():
+                result = {"ok": False, "message": "Unauthenticated"}
+            else:
+                route = body.get("route", "")
+                name = LISTINGS.get(route, ("Item",))[0].rstrip("s")
+                result = {"ok": True, "rows": [{"id": i + 1, "name": f"{name} {i + 1}", "status": "Active" if i % 3 else "Pending"}
+                                               for i in range(LISTING_ROWS)]}
+        elif path == "/api/action":
+            result = {"ok": True, "message": f"{body.get('action')} completed successfully"}
+        else:
+            return self._send(404, json.dumps({"ok": False}), "application/json")
+        self._send(200, json.dumps(result), "application/json", headers)
+
+# A server on host:port (port 0 picks a free one); latency applies to API calls
+def make_server(host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0):
+    handler = type("ConfiguredMockAppHandler", (MockAppHandler,), {"latency_ms": latency_ms, "jitter_ms": jitter_ms})
+    return ThreadingHTTPServer((host, port), handler)
+
+# Serve in a daemon thread; returns (server, base_url)
+def start_mock_app(host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0):
+    server = make_server(host, port, latency_ms, jitter_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the mock Lending Dynamics app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=150, help="Delay added to every API call")
+    parser.add_argument("--jitter-ms", type=int, default=50, help="Random extra delay, up to this much")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(f"Mock app on http://{args.host}:{server.server_address[1]}/#/sign-in")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,30 @@
+from urllib.parse import urlsplit
+
+# Visit navigation for the hash-routed app.
+# Most visits only change the #/route of the page that is already open. Those
+# are done in-page by setting location.hash, which the app's router picks up
+# without reloading the bundle; the caller then waits for the page to be
+# ready. Anything else (another page or origin, the first visit of a session,
+# a step marked "hard_reload") is a full load.
+
+HASH_NAVIGATE_JS = "window.location.hash = arguments[0];"
+
+# True when url is the open document with a different #fragment
+def is_hash_route_change(current_url, url):
+    current, target = urlsplit(current_url or ""), urlsplit(url)
+    if current.scheme not in ("http", "https") or not target.fragment:
+        return False
+    same_document = current._replace(fragment="") == target._replace(fragment="")
+    return same_document and current.fragment != target.fragment
+
+# Open url on driver; returns "hash" for an in-page route change, "load" for a full load
+def navigate(driver, url, hard_reload=False):
+    current_url = driver.current_url
+    if not hard_reload and is_hash_route_change(current_url, url):
+        driver.execute_script(HASH_NAVIGATE_JS, urlsplit(url).fragment)
+        return "hash"
+    driver.get(url)
+    # get() of the open document (or a hash of it) doesn't reload; do it explicitly
+    if urlsplit(current_url or "")._replace(fragment="") == urlsplit(url)._replace(fragment=""):
+        driver.refresh()
+    return "load"
@@ -0,0 +1,85 @@
+# In-page notification collector.
+# A MutationObserver installed once per document buffers Vue-Toastification
+# bodies, role=alert nodes and el-form-item__error texts as they appear. After
+# each step the buffer is drained with one execute_script call, which also
+# dismisses open toasts, so a step with no notification costs no waiting.
+
+NOTIFICATION_SELECTOR = ".Vue-Toastification__toast-body, [role='alert'], .el-form-item__error"
+
+COLLECTOR_JS = """
+(function () {
+    if (window.__tfNotes) { return; }
+    var SELECTOR = "%s";
+    var notes = window.__tfNotes = { buffer: [], seen: new WeakMap() };
+    var record = function (el) {
+        var text = (el.innerText || el.textContent || '').trim();
+        if (!text || notes.seen.get(el) === text) { return; }
+        notes.seen.set(el, text);
+        notes.buffer.push({ text: text, at: Date.now() });
+    };
+    var scan = function (node) {
+        if (node.nodeType !== 1) { node = node.parentElement; }
+        if (!node) { return; }
+        var owner = node.closest(SELECTOR);
+        if (owner) { record(owner); }
+        var inner = node.querySelectorAll(SELECTOR);
+        for (var i = 0; i < inner.length; i++) { record(inner[i]); }
+    };
+    var start = function () {
+        scan(document.documentElement);
+        new MutationObserver(function (mutations) {
+            for (var i = 0; i < mutations.length; i++) {
+                var m = mutations[i];
+                if (m.type === 'childList') {
+                    for (var j = 0; j < m.addedNodes.length; j++) { scan(m.addedNodes[j]); }
+                } else {
+                    // Text or class change: only the notification that owns it matters
+                    var target = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+                    var owner = target && target.closest(SELECTOR);
+                    if (owner) { record(owner); }
+                }
+            }
+        }).observe(document.documentElement, {
+            childList: true, subtree: true, characterData: true,
+            attributes: true, attributeFilter: ['class', 'role']
+        });
+    };
+    if (document.documentElement) { start(); }
+    else { document.addEventListener('readystatechange', start, { once: true }); }
+})();
+""" % NOTIFICATION_SELECTOR.replace('"', '\\"')
+
+DISMISS_JS = """
+var buttons = document.querySelectorAll('.Vue-Toastification__close-button');
+for (var i = 0; i < buttons.length; i++) { buttons[i].click(); }
+"""
+
+DRAIN_JS = COLLECTOR_JS + """
+var entries = window.__tfNotes.buffer.splice(0);
+if (arguments[0]) {""" + DISMISS_JS + """}
+return entries;
+"""
+
+# Install the collector on every new document (Chrome/Edge); drain_notifications
+# installs it on demand for browsers without CDP
+def install_notification_collector(driver):
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": COLLECTOR_JS})
+        except Exception as e:
+            print(f"Error installing notification collector: {e}")
+
+# Everything collected since the last drain, oldest first, as
+# [{"text": ..., "at": epoch_ms}]; with dismiss, open toasts are closed in the same call
+def drain_notifications(driver, dismiss=True):
+    try:
+        return driver.execute_script(DRAIN_JS, dismiss) or []
+    except Exception as e:
+        print(f"Error reading notifications: {e}")
+        return []
+
+def dismiss_toasts(driver):
+    try:
+        driver.execute_script(DISMISS_JS)
+    except Exception as e:
+        print(f"Error clicking toast close button: {e}")
@@ -0,0 +1,191 @@
+import atexit
+import contextlib
+import functools
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from runner import run_test_case
+from session_pool import SessionPool
+from browser_contexts import ContextPool
+from auth_cache import AUTH_DIR, AuthCache
+from screenshots import SCREENSHOT_OPTION_NAMES, get_screenshot_store
+from step_plans import CompiledCase
+from memory import wait_for_free_memory
+
+# Fan the (case, CSV row, repeat) matrix out over N worker processes.
+# Each worker process drives its own WebDriver; results come back in job order
+# so the merged logs match what the sequential loop would have produced.
+
+# Run settings shared by every job; callers override what they need
+DEFAULT_RUN_OPTIONS = {
+    "headless": True,
+    "browser": "chrome",
+    "reuse_sessions": True,
+    "reuse_logins": False,
+    "persist_logins": False,
+    "screenshot_mode": "always",
+    "screenshot_every_n": 5,
+    "screenshot_format": "png",
+    "screenshot_quality": 70,
+    "screenshot_scale": 1.0,
+    "screenshot_clip": "viewport",
+    "screenshot_dedup_bits": 0,
+    "load_profile": "full",
+    "browser_contexts": False,
+    # Browser recycling and dispatch throttling; 0 turns a limit off
+    "recycle_after_runs": 25,
+    "recycle_above_mb": 0,
+    "min_free_memory_mb": 0,
+}
+
+# Build the job matrix in the same order the sequential run loop uses.
+# With CSV data each job's case carries its row's steps with the placeholders
+# already filled in (see step_plans.CompiledCase).
+def build_jobs(test_cases, selected_cases, csv_data=None, repeat=1):
+    jobs = []
+    for name in selected_cases:
+        test = next(tc for tc in test_cases if tc["name"] == name)
+        if csv_data is not None:
+            row_steps = CompiledCase(test).expand(csv_data)
+            for (idx, row), steps in zip(csv_data.iterrows(), row_steps):
+                case = dict(test, steps=steps)
+                for r in range(repeat):
+                    jobs.append({"case": case, "row_index": idx, "csv_row": row, "repeat_index": r})
+        else:
+            for r in range(repeat):
+                jobs.append({"case": test, "row_index": None, "csv_row": None, "repeat_index": r})
+    return jobs
+
+# Session pool and login cache live for the whole life of a process, so
+# consecutive jobs in the same worker share warm browsers and logins
+_session_pool = None
+_auth_cache = None
+
+def get_session_pool(run_options):
+    global _session_pool
+    if _session_pool is None:
+        if run_options["browser_contexts"]:
+            _session_pool = ContextPool(headless=run_options["headless"], browser=run_options["browser"],
+                                        load_profile=run_options["load_profile"],
+                                        max_uses=run_options["recycle_after_runs"],
+                                        max_rss_mb=run_options["recycle_above_mb"])
+        else:
+            _session_pool = SessionPool(headless=run_options["headless"], browser=run_options["browser"],
+                                        load_profile=run_options["load_profile"],
+                                        max_uses=run_options["recycle_after_runs"],
+                                        max_rss_mb=run_options["recycle_above_mb"])
+        atexit.register(_session_pool.close)
+    return _session_pool
+
+def get_auth_cache(run_options):
+    global _auth_cache
+    if _auth_cache is None:
+        _auth_cache = AuthCache(persist_dir=AUTH_DIR if run_options["persist_logins"] else None)
+    return _auth_cache
+
+# on_step (optional): called with each step_log of the job as it is produced
+def run_job(job, run_options, on_step=None):
+    wait_for_free_memory(run_options["min_free_memory_mb"])
+    session_pool = get_session_pool(run_options) if run_options["reuse_sessions"] or run_options["browser_contexts"] else None
+    auth_cache = get_auth_cache(run_options) if run_options["reuse_logins"] else None
+    return run_test_case(job["case"], headless=run_options["headless"], repeat=1, csv_row=job["csv_row"],
+                         browser=run_options["browser"], session_pool=session_pool, auth_cache=auth_cache,
+                         load_profile=run_options["load_profile"], on_step=on_step,
+                         **{name: run_options[name] for name in SCREENSHOT_OPTION_NAMES})
+
+def close_worker_state():
+    global _session_pool, _auth_cache
+    if _session_pool is not None:
+        _session_pool.close()
+        atexit.unregister(_session_pool.close)
+    _session_pool = None
+    _auth_cache = None
+
+# Worker side of on_step: hand the step to the caller's thread through a queue
+def queue_step(step_queue, job_index, log):
+    step_queue.put((job_index, log))
+
+# Pass queued steps to on_step in the caller's thread; with a timeout, waits
+# that long for the first one
+def relay_steps(step_queue, on_step, timeout=None):
+    while True:
+        try:
+            job_index, log = step_queue.get(timeout=timeout) if timeout else step_queue.get_nowait()
+        except queue.Empty:
+            return
+        on_step(job_index, log)
+        timeout = None
+
+# Start every job on executor, in schedule order when given; {job_index: future}
+def _submit_jobs(executor, jobs, run_options, step_queue=None, schedule=None):
+    futures = {}
+    for job_index in (schedule if schedule is not None else range(len(jobs))):
+        futures[job_index] = executor.submit(
+            run_job, jobs[job_index], run_options,
+            functools.partial(queue_step, step_queue, job_index) if step_queue is not None else None)
+    return futures
+
+# Yield (job, logs) in job order as the futures finish, relaying queued steps meanwhile
+def _collect_jobs(jobs, futures, step_queue=None, on_step=None):
+    for job_index, job in enumerate(jobs):
+        future = futures[job_index]
+        if on_step:
+            while not future.done():
+                relay_steps(step_queue, on_step, timeout=0.2)
+            # A worker's last put happens before its result is ready
+            relay_steps(step_queue, on_step)
+        try:
+            logs = future.result()
+        except Exception as e:
+            logs = [{"status": f"❌ Error: {e}"}]
+            if on_step:
+                on_step(job_index, logs[0])
+        yield job, logs
+
+# Run every job and yield (job, logs) pairs in job order as they become available.
+# on_step (optional): called as on_step(job_index, log) in the caller's thread
+# for every step log as soon as a worker produces it, before its job is yielded
+# schedule (optional): job indices in the order workers should start them
+# (see durations.longest_first); results are still yielded in job order
+def run_jobs(jobs, workers=1, on_step=None, schedule=None, **options):
+    run_options = dict(DEFAULT_RUN_OPTIONS, **options)
+    if workers <= 1:
+        try:
+            for job_index, job in enumerate(jobs):
+                yield job, run_job(job, run_options, functools.partial(on_step, job_index) if on_step else None)
+        finally:
+            close_worker_state()
+        return
+
+    # spawn keeps worker start-up identical on Windows and Linux and avoids
+    # forking a process that already has WebDriver threads running
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager() if on_step else contextlib.nullcontext()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor, manager:
+        step_queue = manager.Queue() if on_step else None
+        futures = _submit_jobs(executor, jobs, run_options, step_queue, schedule)
+        yield from _collect_jobs(jobs, futures, step_queue, on_step)
+
+# Same contract as run_jobs, with up to sessions browsers driven from threads
+# of this process instead of one worker process each. Selenium's calls block,
+# so every running job holds a thread; the threads spend their time waiting
+# on the browser, not holding the GIL. All sessions share the process's
+# session pool (or browser contexts), login cache and screenshot writer.
+def run_jobs_threaded(jobs, sessions=8, on_step=None, schedule=None, **options):
+    run_options = dict(DEFAULT_RUN_OPTIONS, **options)
+    # Create the shared per-process state before threads race to do it
+    if run_options["reuse_sessions"] or run_options["browser_contexts"]:
+        get_session_pool(run_options)
+    if run_options["reuse_logins"]:
+        get_auth_cache(run_options)
+    get_screenshot_store()
+
+    step_queue = queue.Queue() if on_step else None
+    executor = ThreadPoolExecutor(max_workers=max(int(sessions), 1), thread_name_prefix="session")
+    try:
+        futures = _submit_jobs(executor, jobs, run_options, step_queue, schedule)
+        yield from _collect_jobs(jobs, futures, step_queue, on_step)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        close_worker_state()
@@ -0,0 +1,354 @@
+import contextlib
+import functools
+import json
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from runner import create_driver, execute_step, restored_login_log, substitute_placeholders
+from screenshots import ScreenshotPolicy, flush_screenshots, policy_from_options
+from auth_cache import READ_STORAGE_JS, WRITE_STORAGE_JS, clean_cookie, login_key, split_login_prefix
+from session_pool import RESET_STORAGE_JS
+from load_profiles import apply_load_profile
+from parallel_runner import (DEFAULT_RUN_OPTIONS, close_worker_state, get_auth_cache, get_session_pool, queue_step,
+                             relay_steps)
+from memory import RunMemory, wait_for_free_memory
+
+# Prefix-tree execution planner.
+# Every (case, CSV row, repeat) job becomes a path of substituted steps in a
+# trie, so steps shared by several jobs (login, then the same listing page)
+# run once. At a branch point the browser is rewound to the last visit on the
+# shared path: cookies and storage are restored from a snapshot taken just
+# before that visit, and the steps from the visit up to the branch point are
+# replayed. Only steps that are safe to run twice are ever replayed: a job
+# that would branch off after a click (save, submit, approve) or a writing
+# http call since the last visit branches off higher up instead and runs
+# those steps itself. Each job still gets its full step log.
+# With reuse_logins a job's login block is one "login" node that restores a
+# saved session when its worker has one (see auth_cache), and jobs with their
+# own load_profile get trees of their own.
+
+class PlanNode:
+    def __init__(self, step=None, csv_row=None):
+        self.step = step
+        # Row the step runs with; every job sharing this node resolves it the same way
+        self.csv_row = csv_row
+        self.children = {}
+        self.jobs = []
+        self.snapshot = None
+        # On roots and units: the load profile their browser runs with
+        self.load_profile = None
+
+# Key a step by its values after placeholder substitution
+def resolve_step(step, csv_row):
+    return json.dumps({k: substitute_placeholders(v, csv_row) for k, v in step.items()}, sort_keys=True, default=str)
+
+# Steps a rewind can restart from, and steps that can run again on a rewind
+# without changing server data
+REWIND_ACTIONS = ("visit", "login")
+REPLAY_SAFE_ACTIONS = ("visit", "login", "input", "assert", "select_dropdown")
+
+def replay_safe(step):
+    if step["action"] == "http":
+        return step.get("method", "GET").upper() == "GET"
+    return step["action"] in REPLAY_SAFE_ACTIONS
+
+# Deepest node of path (root first) at or above depth that a job can branch
+# off from with a safe replay; 0 (the root) when none can
+def _fork_depth(path, depth):
+    while depth > 0:
+        last_visit = max((i for i in range(1, depth + 1) if path[i].step["action"] in REWIND_ACTIONS), default=None)
+        if last_visit is None:
+            return 0
+        if all(replay_safe(node.step) for node in path[last_visit:depth + 1]):
+            return depth
+        depth = last_visit - 1
+    return 0
+
+# A job's steps as the plan runs them: with reuse_logins its login block is
+# a single "login" step
+def plan_steps(job, reuse_logins=False):
+    steps = job["case"]["steps"]
+    if not reuse_logins:
+        return steps
+    login_steps, remaining_steps = split_login_prefix(steps)
+    if not login_steps:
+        return steps
+    return [{"action": "login", "login_key": login_key(login_steps, job["csv_row"]), "steps": login_steps}] + remaining_steps
+
+# One tree per repeat and load profile, so repeats still execute separately
+def build_plan_trees(jobs, reuse_logins=False, load_profile="full"):
+    roots = {}
+    for job_index, job in enumerate(jobs):
+        profile = job["case"].get("load_profile") or load_profile
+        if (job["repeat_index"], profile) not in roots:
+            roots[(job["repeat_index"], profile)] = PlanNode()
+            roots[(job["repeat_index"], profile)].load_profile = profile
+        path = [roots[(job["repeat_index"], profile)]]
+        steps = plan_steps(job, reuse_logins)
+        for position, step in enumerate(steps):
+            node = path[-1]
+            key = resolve_step(step, job["csv_row"])
+            if key in node.children:
+                path.append(node.children[key])
+                continue
+            if node.children:
+                # A new branch: the job gets its own steps from the fork on
+                path = path[:_fork_depth(path, position) + 1]
+                for own_step in steps[len(path) - 1:]:
+                    parent = path[-1]
+                    own_key = resolve_step(own_step, job["csv_row"])
+                    if own_key in parent.children:
+                        own_key += f"#{len(parent.children)}"
+                    parent.children[own_key] = PlanNode(own_step, job["csv_row"])
+                    path.append(parent.children[own_key])
+                break
+            node.children[key] = PlanNode(step, job["csv_row"])
+            path.append(node.children[key])
+        path[-1].jobs.append(job_index)
+    return list(roots.values())
+
+def count_planned_steps(node):
+    return sum((len(child.step["steps"]) if child.step["action"] == "login" else 1) + count_planned_steps(child)
+               for child in node.children.values())
+
+# (planned step executions, step executions without sharing)
+def plan_summary(jobs, reuse_logins=False, load_profile="full"):
+    planned = sum(count_planned_steps(root) for root in build_plan_trees(jobs, reuse_logins, load_profile))
+    return planned, sum(len(job["case"]["steps"]) for job in jobs)
+
+def _subtree_jobs(node):
+    found = list(node.jobs)
+    for child in node.children.values():
+        found.extend(_subtree_jobs(child))
+    return found
+
+# Split a unit at its first branch point so workers can run the branches side
+# by side (usually one per login user); the chain above it runs once per branch
+def _split_unit(unit):
+    chain = []
+    node = unit
+    while len(node.children) == 1 and not node.jobs:
+        node = next(iter(node.children.values()))
+        chain.append(node)
+    if len(node.children) < 2:
+        return [unit]
+    units = []
+    for i, (key, branch) in enumerate(node.children.items()):
+        top = parent = PlanNode()
+        top.load_profile = unit.load_profile
+        for link in chain:
+            copy = PlanNode(link.step, link.csv_row)
+            parent.children[resolve_step(link.step, link.csv_row)] = copy
+            parent = copy
+        if i == 0:
+            parent.jobs = list(node.jobs)
+        parent.children[key] = branch
+        units.append(top)
+    return units
+
+def _take_snapshot(driver):
+    parts = urlsplit(driver.current_url)
+    return {
+        "origin": f"{parts.scheme}://{parts.netloc}" if parts.scheme.startswith("http") else None,
+        "cookies": driver.get_cookies(),
+        "storage": driver.execute_script(READ_STORAGE_JS) if parts.scheme.startswith("http") else None,
+    }
+
+def _restore_snapshot(driver, snapshot):
+    parts = urlsplit(driver.current_url)
+    current_origin = f"{parts.scheme}://{parts.netloc}"
+    if snapshot["origin"] and snapshot["origin"] != current_origin:
+        driver.get(snapshot["origin"] + "/")
+    if driver.current_url.startswith("http"):
+        driver.execute_script(RESET_STORAGE_JS)
+    driver.delete_all_cookies()
+    for cookie in snapshot["cookies"]:
+        driver.add_cookie(clean_cookie(cookie))
+    if snapshot["storage"]:
+        driver.execute_script(WRITE_STORAGE_JS, snapshot["storage"])
+
+# Run one plan step and return its step logs; a login step restores the
+# user's saved session when auth_cache has one, or runs the login block
+def _execute(driver, step, csv_row, screenshot_policy, auth_cache=None):
+    if step["action"] != "login":
+        return [execute_step(driver, step, csv_row, screenshot_policy=screenshot_policy)]
+    if auth_cache is not None and auth_cache.restore(driver, step["login_key"]):
+        return [restored_login_log(driver, step["steps"], csv_row)]
+    first, *rest = step["steps"]
+    logs = [execute_step(driver, dict(first, hard_reload=step.get("hard_reload", False)), csv_row,
+                         screenshot_policy=screenshot_policy)]
+    logs += [execute_step(driver, login_step, csv_row, screenshot_policy=screenshot_policy) for login_step in rest]
+    if auth_cache is not None and logs[-1]["status"].startswith("✅"):
+        auth_cache.save(driver, step["login_key"])
+    return logs
+
+# Bring the browser back to the state right after the last node of path
+def _rewind(driver, path, auth_cache=None):
+    last_visit = max((i for i, node in enumerate(path) if node.step["action"] in REWIND_ACTIONS), default=None)
+    if last_visit is None:
+        _restore_snapshot(driver, {"origin": None, "cookies": [], "storage": None})
+        driver.get("about:blank")
+        return
+    _restore_snapshot(driver, path[last_visit].snapshot)
+    # Replayed steps are already in the logs; no screenshots needed
+    replay_policy = ScreenshotPolicy("never")
+    # The visit is a full load even when only its #route differs, so the app
+    # starts over from the restored cookies and storage instead of keeping the
+    # previous branch's signed-in state in memory
+    replay = [dict(path[last_visit].step, screenshot=None, hard_reload=True)]
+    replay += [dict(node.step, screenshot=None) for node in path[last_visit + 1:]]
+    for step, node in zip(replay, path[last_visit:]):
+        for step_log in _execute(driver, step, node.csv_row, replay_policy, auth_cache):
+            # Later branches must not run on a page the replay didn't reach
+            if str(step_log.get("status", "")).startswith("❌"):
+                raise Exception(f"Replaying {step['action']} step before this branch failed: {step_log['status']}")
+
+# Execute the subtree under node in driver; returns {job_index: logs}
+# auth_cache (optional): where login steps restore and save sessions
+# on_step (optional): called as on_step(job_index, log) for every job a step
+# log belongs to, as soon as the step finishes
+def run_plan_node(driver, node, path=None, path_logs=None, screenshot_policy=None, run_memory=None, auth_cache=None,
+                  on_step=None):
+    screenshot_policy = screenshot_policy or ScreenshotPolicy()
+    path = path or []
+    path_logs = path_logs or []
+    results = {job_index: list(path_logs) for job_index in node.jobs}
+    for i, child in enumerate(node.children.values()):
+        try:
+            if i > 0:
+                _rewind(driver, path, auth_cache)
+            if child.step["action"] in REWIND_ACTIONS:
+                child.snapshot = _take_snapshot(driver)
+            step_logs = _execute(driver, child.step, child.csv_row, screenshot_policy, auth_cache)
+            if run_memory is not None:
+                for step_log in step_logs:
+                    step_log.update(run_memory.sample())
+        except Exception as e:
+            step_logs = None
+            error_log = {"status": f"❌ Error: {e}"}
+        if on_step is not None:
+            for job_index in _subtree_jobs(child):
+                for log in (step_logs if step_logs is not None else [error_log]):
+                    on_step(job_index, log)
+        if step_logs is None:
+            for job_index in _subtree_jobs(child):
+                results[job_index] = path_logs + [error_log]
+            continue
+        results.update(run_plan_node(driver, child, path + [child], path_logs + step_logs, screenshot_policy,
+                                     run_memory, auth_cache, on_step))
+    return results
+
+def _run_unit(unit, run_options, on_step=None):
+    session_pool = get_session_pool(run_options) if run_options["reuse_sessions"] else None
+    auth_cache = get_auth_cache(run_options) if run_options["reuse_logins"] else None
+    # The unit's own profile is switched on for its run only; pooled browsers
+    # go back to the run's profile
+    profile = unit.load_profile or run_options["load_profile"]
+    driver = None
+    wait_for_free_memory(run_options["min_free_memory_mb"])
+    try:
+        if session_pool is not None:
+            driver = session_pool.acquire()
+        else:
+            driver = create_driver(headless=run_options["headless"], browser=run_options["browser"],
+                                   load_profile=run_options["load_profile"])
+        if profile != run_options["load_profile"]:
+            apply_load_profile(driver, profile)
+        screenshot_policy = policy_from_options(run_options)
+        return run_plan_node(driver, unit, screenshot_policy=screenshot_policy, run_memory=RunMemory(driver),
+                             auth_cache=auth_cache, on_step=on_step)
+    except Exception as e:
+        error_log = {"status": f"❌ Error: {e}"}
+        if on_step is not None:
+            for job_index in _subtree_jobs(unit):
+                on_step(job_index, error_log)
+        return {job_index: [error_log] for job_index in _subtree_jobs(unit)}
+    finally:
+        flush_screenshots()
+        if driver is not None:
+            if session_pool is not None:
+                if profile != run_options["load_profile"]:
+                    apply_load_profile(driver, run_options["load_profile"])
+                session_pool.release(driver)
+            else:
+                try:
+                    driver.quit()
+                except:
+                    pass
+
+# Shared rows run with one representative CSV row; tag each job with its own LoginEmail
+def _finish_logs(job, logs):
+    csv_row = job["csv_row"]
+    if csv_row is None or "LoginEmail" not in csv_row:
+        return logs
+    return [dict(log, LoginEmail=csv_row["LoginEmail"]) if "action" in log else log for log in logs]
+
+# Same contract as parallel_runner.run_jobs: yields (job, logs) in job order.
+# Independent subtrees (typically one per login user) are spread over workers.
+# on_step gets every step log as soon as it is produced, once for each job it
+# belongs to (shared steps belong to several)
+def run_planned(jobs, workers=1, on_step=None, **options):
+    run_options = dict(DEFAULT_RUN_OPTIONS, **options)
+    units = []
+    ready = {}
+    for root in build_plan_trees(jobs, run_options["reuse_logins"], run_options["load_profile"]):
+        for job_index in root.jobs:
+            ready[job_index] = []
+        # Each top-level branch becomes a unit with its own browser
+        for key, child in root.children.items():
+            unit = PlanNode()
+            unit.load_profile = root.load_profile
+            unit.children[key] = child
+            units.append(unit)
+
+    if workers > 1:
+        units = [split for unit in units for split in _split_unit(unit)]
+
+    def emit(job_index, log):
+        for tagged in _finish_logs(jobs[job_index], [log]):
+            on_step(job_index, tagged)
+
+    position = 0
+    def drain():
+        nonlocal position
+        while position in ready:
+            job = jobs[position]
+            logs = _finish_logs(job, ready.pop(position))
+            position += 1
+            yield job, logs
+
+    if workers <= 1:
+        try:
+            for unit in units:
+                ready.update(_run_unit(unit, run_options, emit if on_step else None))
+                yield from drain()
+            yield from drain()
+        finally:
+            close_worker_state()
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager() if on_step else contextlib.nullcontext()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor, manager:
+        step_queue = manager.Queue() if on_step else None
+        futures = {executor.submit(_run_unit, unit, run_options,
+                                   functools.partial(queue_step, step_queue) if on_step else None): unit
+                   for unit in units}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2 if on_step else None, return_when=FIRST_COMPLETED)
+            if on_step:
+                # A worker's last put happens before its result is ready
+                relay_steps(step_queue, emit)
+            for future in done:
+                try:
+                    ready.update(future.result())
+                except Exception as e:
+                    logs = [{"status": f"❌ Error: {e}"}]
+                    for job_index in _subtree_jobs(futures[future]):
+                        ready[job_index] = logs
+                        if on_step:
+                            emit(job_index, logs[0])
+            yield from drain()
+    yield from drain()
@@ -0,0 +1,85 @@
+from auth_cache import split_login_prefix
+from run_log import ATTEMPT_KEY, JOB_KEY, latest_attempts, load_manifest, read_run_log, rerunnable_run_logs
+
+# Rerunning the failures of an earlier run.
+# A job (case, CSV row, repeat) failed when a step of its latest attempt
+# failed, or when it left no steps at all (the run stopped before it).
+# Failed jobs run again and their records are appended to the original run
+# file as a new attempt, which replaces the old one in the report.
+# With resume, a job that failed after its login block replays the login and
+# continues from the last visit before the failing step instead of from the
+# top; the original logs of the steps it skipped are carried into the new
+# attempt so the merged report still shows every step.
+
+def is_failure(record):
+    return str(record.get("status", "")).startswith("❌")
+
+# Index of the case step each record belongs to; a cached "login" record
+# stands for the whole login block
+def step_positions(records, login_count):
+    position = 0
+    for record in records:
+        yield position, record
+        position += login_count if record.get("action") == "login" else 1
+
+# Index of the step to resume from, or None when the job should run in full
+def resume_point(case, records, login_count):
+    if not login_count:
+        return None
+    failed_at = next((position for position, record in step_positions(records, login_count) if is_failure(record)), None)
+    if failed_at is None or failed_at < login_count or failed_at >= len(case["steps"]):
+        return None
+    visits = [i for i in range(login_count, failed_at + 1) if case["steps"][i].get("action") == "visit"]
+    start = visits[-1] if visits else login_count
+    return start if start > login_count else None
+
+# Jobs of a run whose latest attempt failed, as
+# {"job_index", "job", "carry", "login_count"} entries ready to run
+def plan_reruns(run_log_path, resume=False):
+    attempts = latest_attempts(run_log_path)
+    reruns = []
+    for job_index, job in enumerate(load_manifest(run_log_path)):
+        records = attempts.get(job_index, [])
+        if records and not any(is_failure(record) for record in records):
+            continue
+        entry = {"job_index": job_index, "job": job, "carry": [], "login_count": 0}
+        login_steps, _ = split_login_prefix(job["case"]["steps"])
+        start = resume_point(job["case"], records, len(login_steps)) if resume else None
+        if start is not None:
+            entry["job"] = dict(job, case=dict(job["case"], steps=login_steps + job["case"]["steps"][start:]))
+            entry["carry"] = [{k: v for k, v in record.items() if k not in (JOB_KEY, ATTEMPT_KEY)}
+                              for position, record in step_positions(records, len(login_steps))
+                              if len(login_steps) <= position < start]
+            entry["login_count"] = len(login_steps)
+        reruns.append(entry)
+    return reruns
+
+# on_step callback for a rerun: maps rerun positions back to the original job
+# indices and, for resumed jobs, writes the carried records right after the
+# replayed login so each job's steps stay in case order
+class RerunStream:
+    def __init__(self, reruns, write):
+        self.reruns = reruns
+        self.write = write
+        self.covered = [0] * len(reruns)
+
+    def __call__(self, position, log):
+        entry = self.reruns[position]
+        self.write(entry["job_index"], log)
+        if not entry["carry"] or self.covered[position] >= entry["login_count"]:
+            return
+        self.covered[position] += entry["login_count"] if log.get("action") == "login" else 1
+        if self.covered[position] >= entry["login_count"] and not is_failure(log):
+            for record in entry["carry"]:
+                self.write(entry["job_index"], record)
+
+# Screenshots a report can delete: every file run_log_path references except
+# those a failed job of any rerunnable run still shows (frames are shared by
+# content, and a rerun's report carries the files of the steps it resumes past)
+def disposable_screenshots(run_log_path):
+    keep = set()
+    for path in rerunnable_run_logs():
+        for records in latest_attempts(path).values():
+            if any(is_failure(record) for record in records):
+                keep.update(record.get("screenshot") for record in records)
+    return {record.get("screenshot") for record in read_run_log(run_log_path)} - keep - {None}
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.request
+from datetime import datetime
+
+from runner import substitute_placeholders
+
+# Result cache for unchanged runs.
+# A job's key is a hash of its fully substituted steps plus a fingerprint of
+# the build under test, so the same case on the same CSV row against the same
+# build maps to the same entry. Passing jobs are stored under RESULT_CACHE_DIR;
+# within max_age a hit replays the stored step logs, marked "cached", instead
+# of opening a browser. Failing jobs are never cached.
+
+RESULT_CACHE_DIR = "result_cache"
+# <meta name="..."> tags the app may use to announce its build
+BUILD_META_NAMES = ("build", "build-id", "version", "app-version", "commit")
+FINGERPRINT_TIMEOUT = 10
+
+META_RE = re.compile(r"<meta\s[^>]*>", re.IGNORECASE)
+ATTR_RE = re.compile(r"""([\w-]+)\s*=\s*["']([^"']*)["']""")
+ASSET_RE = re.compile(r"""<(?:script|link)\s[^>]*(?:src|href)\s*=\s*["']([^"']+\.(?:js|css)[^"']*)["']""", re.IGNORECASE)
+
+# Build fingerprint of the app serving url: a build/version meta tag if the
+# page has one, else a hash of its script and stylesheet URLs (bundlers put
+# content hashes in those). None when the page can't be read.
+def detect_build_fingerprint(url, timeout=FINGERPRINT_TIMEOUT):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            html = response.read().decode("utf-8", errors="replace")
+    except Exception as e:
+        print(f"Error detecting build fingerprint: {e}")
+        return None
+    for tag in META_RE.findall(html):
+        attrs = {name.lower(): value for name, value in ATTR_RE.findall(tag)}
+        if attrs.get("name", "").lower() in BUILD_META_NAMES and attrs.get("content"):
+            return f"{attrs['name']}:{attrs['content']}"
+    assets = sorted(set(ASSET_RE.findall(html)))
+    digest = hashlib.sha1("\n".join(assets or [html]).encode("utf-8")).hexdigest()[:16]
+    return f"assets:{digest}"
+
+# First visit URL of a job, with placeholders filled in
+def first_visit_url(job):
+    for step in job["case"]["steps"]:
+        if step.get("action") == "visit" and step.get("url"):
+            return substitute_placeholders(step["url"], job["csv_row"])
+    return None
+
+def is_passing(logs):
+    return bool(logs) and not any(str(log.get("status", "")).startswith("❌") for log in logs)
+
+class ResultCache:
+    def __init__(self, fingerprint, max_age=24 * 3600, cache_dir=RESULT_CACHE_DIR):
+        self.fingerprint = fingerprint
+        self.max_age = max_age
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Same substituted steps on the same build -> same result
+    def key_for(self, job):
+        plan = [substitute_placeholders(step, job["csv_row"]) for step in job["case"]["steps"]]
+        payload = {"plan": plan, "fingerprint": self.fingerprint, "repeat_index": job["repeat_index"]}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    # Stored step logs for job, or None on a miss
+    def get(self, job):
+        path = self._path(self.key_for(job))
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except Exception as e:
+            print(f"Error reading cached result: {e}")
+            return None
+        if self.max_age and time.time() - entry["saved_at"] > self.max_age:
+            self._remove(path)
+            return None
+        cached_at = datetime.fromtimestamp(entry["saved_at"]).isoformat(timespec="seconds")
+        return [dict(log, cached=cached_at) for log in entry["logs"]]
+
+    def put(self, job, logs):
+        if not is_passing(logs):
+            return
+        # Screenshots are cleaned up after each report, so cached logs don't point at them
+        entry = {"saved_at": time.time(), "logs": [{k: v for k, v in log.items() if k != "screenshot"} for log in logs]}
+        path = self._path(self.key_for(job))
+        try:
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False, default=str)
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            print(f"Error saving cached result: {e}")
+
+    # {job index: cached logs} for the jobs that hit
+    def lookup(self, jobs):
+        hits = {}
+        for job_index, job in enumerate(jobs):
+            logs = self.get(job)
+            if logs is not None:
+                hits[job_index] = logs
+        return hits
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except Exception as e:
+            print(f"Error removing cached result: {e}")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+# Same contract as parallel_runner.run_jobs: yields (job, logs) in job order.
+# hits (from ResultCache.lookup) are streamed through on_step straight away;
+# the other jobs go to start(pending_jobs, on_step) and their passing results
+# are stored in cache.
+def run_with_cache(jobs, hits, start, cache, on_step=None):
+    pending = [job_index for job_index in range(len(jobs)) if job_index not in hits]
+    if on_step is not None:
+        for job_index in sorted(hits):
+            for log in hits[job_index]:
+                on_step(job_index, log)
+
+    def pending_step(position, log):
+        on_step(pending[position], log)
+
+    results = iter(())
+    if pending:
+        results = start([jobs[job_index] for job_index in pending], pending_step if on_step is not None else None)
+    for job_index, job in enumerate(jobs):
+        if job_index in hits:
+            yield job, hits[job_index]
+        else:
+            job, logs = next(results)
+            cache.put(job, logs)
+            yield job, logs
@@ -0,0 +1,105 @@
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+# Streaming run files.
+# Every step log is appended to a JSONL file under RUN_LOG_DIR the moment it is
+# produced, tagged with the index of its job, so a crashed or stopped run keeps
+# everything it did and the app never has to hold a whole run in memory.
+# Reports read the file back afterwards. Next to each run file a manifest
+# keeps the run's jobs, so its failures can be rerun later; rerun records are
+# appended to the same file under a higher attempt number.
+
+RUN_LOG_DIR = "run_logs"
+JOB_KEY = "job_index"
+ATTEMPT_KEY = "attempt"
+
+def new_run_log_path(name):
+    os.makedirs(RUN_LOG_DIR, exist_ok=True)
+    return f"{RUN_LOG_DIR}/{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+class RunLog:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def append(self, job_index, log, attempt=0):
+        record = {JOB_KEY: job_index, ATTEMPT_KEY: attempt, **log} if attempt else {JOB_KEY: job_index, **log}
+        self.file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Records one at a time; a line cut short by a crash is skipped
+def read_run_log(path):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+# {job index: step records of its latest attempt}
+def latest_attempts(path):
+    attempts = {}
+    for record in read_run_log(path):
+        job_index = record.get(JOB_KEY, 0)
+        attempt = record.get(ATTEMPT_KEY, 0)
+        latest, records = attempts.get(job_index, (-1, []))
+        if attempt > latest:
+            attempts[job_index] = (attempt, [record])
+        elif attempt == latest:
+            records.append(record)
+    return {job_index: records for job_index, (attempt, records) in attempts.items()}
+
+def last_attempt(path):
+    return max((record.get(ATTEMPT_KEY, 0) for record in read_run_log(path)), default=0)
+
+# Step logs of a run as a DataFrame, grouped by job in job order (steps of
+# parallel jobs are interleaved in the file). A rerun job replaces its
+# earlier attempts.
+def load_run_report(path):
+    attempts = latest_attempts(path)
+    return pd.DataFrame([{k: v for k, v in record.items() if k not in (JOB_KEY, ATTEMPT_KEY)}
+                         for job_index in sorted(attempts) for record in attempts[job_index]])
+
+# A job as plain JSON: its case, CSV row and repeat number
+def job_record(job):
+    csv_row = job["csv_row"]
+    return {
+        "case": job["case"],
+        "row_index": job["row_index"],
+        "csv_row": csv_row.to_dict() if hasattr(csv_row, "to_dict") else csv_row,
+        "repeat_index": job["repeat_index"],
+    }
+
+def manifest_path(run_log_path):
+    return re.sub(r"\.jsonl$", "", run_log_path) + ".jobs.json"
+
+def save_manifest(run_log_path, jobs):
+    try:
+        with open(manifest_path(run_log_path), "w", encoding="utf-8") as file:
+            json.dump([job_record(job) for job in jobs], file, ensure_ascii=False, default=str)
+    except Exception as e:
+        print(f"Error saving run manifest: {e}")
+
+def load_manifest(run_log_path):
+    with open(manifest_path(run_log_path), encoding="utf-8") as file:
+        return json.load(file)
+
+# Run files that can be rerun, newest first
+def rerunnable_run_logs():
+    if not os.path.isdir(RUN_LOG_DIR):
+        return []
+    paths = [f"{RUN_LOG_DIR}/{name}" for name in os.listdir(RUN_LOG_DIR) if name.endswith(".jsonl")]
+    return sorted((path for path in paths if os.path.exists(manifest_path(path))), key=os.path.getmtime, reverse=True)
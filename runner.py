@@ -0,0 +1,343 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+
+from waits import ELEMENT_TIMEOUT, prepare_driver, wait_for_element, wait_for_page_ready
+from dom_batch import find_menu_item
+from assertions import ASSERT_TIMEOUT, run_assertions, step_assertions
+from notifications import dismiss_toasts, drain_notifications, install_notification_collector
+from screenshots import ScreenshotPolicy, capture_screenshot, flush_screenshots
+from load_profiles import apply_load_profile, count_blocked_requests
+from timings import PhaseTimer
+from navigation import navigate
+from memory import RunMemory
+from http_steps import HTTP_TIMEOUT, MISSING_REQUESTS, http_available, json_path, response_excerpt, send_request, variable_text
+from step_plans import render_template
+
+# Browser engine shared by the Streamlit app and the parallel worker processes.
+# Kept free of any Streamlit calls so it can be imported from a worker.
+
+# Start a fresh browser for a run
+# load_profile: one of load_profiles.LOAD_PROFILES, the resources it never fetches
+def create_driver(headless=True, browser="chrome", load_profile="full"):
+    if browser == "edge":
+        options = EdgeOptions()
+    else:
+        options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--incognito")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-cache")
+    if browser == "edge":
+        driver = webdriver.Edge(service=EdgeService(), options=options)
+    else:
+        driver = webdriver.Chrome(options=options)
+    prepare_driver(driver)
+    install_notification_collector(driver)
+    if load_profile and load_profile != "full":
+        apply_load_profile(driver, load_profile)
+    driver.maximize_window()
+    driver.delete_all_cookies()
+    return driver
+
+# Universal element finder; waits in-page until the element is there (and
+# displayed/enabled when interactable) or timeout seconds have passed
+def find_element(driver, selector_type, selector_value, index=0, timeout=ELEMENT_TIMEOUT, interactable=True,
+                 enabled=None):
+    return wait_for_element(driver, selector_type, selector_value, index, timeout=timeout, interactable=interactable,
+                            enabled=enabled)
+
+# Fills {{Column}} placeholders from csv_row; lists and dicts (e.g. a step's
+# assertions) are filled recursively
+def substitute_placeholders(text, csv_row):
+    if isinstance(text, list):
+        return [substitute_placeholders(item, csv_row) for item in text]
+    if isinstance(text, dict):
+        return {key: substitute_placeholders(value, csv_row) for key, value in text.items()}
+    if not isinstance(text, str) or csv_row is None:
+        return text
+    return render_template(text, csv_row)
+
+# csv_row plus the variables earlier http steps extracted, for placeholders
+def with_variables(csv_row, variables):
+    if not variables:
+        return csv_row
+    row = csv_row.to_dict() if hasattr(csv_row, "to_dict") else dict(csv_row or {})
+    row.update(variables)
+    return row
+
+# Notification texts that appeared since the previous step
+def capture_notification(driver, dismiss=True):
+    return [entry["text"] for entry in drain_notifications(driver, dismiss=dismiss)]
+
+# Actions whose outcome can be reported by a toast or alert
+NOTIFYING_ACTIONS = ("visit", "click", "select_dropdown")
+
+# Step actions: each runs its action on driver, fills in step_log and returns
+# the element it acted on (or None)
+def visit_step(driver, step, csv_row, timer, step_log):
+    expected_url = substitute_placeholders(step["url"], csv_row)
+    with timer.phase("action"):
+        step_log["navigation"] = navigate(driver, expected_url, hard_reload=step.get("hard_reload", False))
+    with timer.phase("settle"):
+        wait_for_page_ready(driver)
+    actual_url = driver.current_url
+    step_log["actual_url"] = actual_url
+    step_log["status"] = "✅ Success" if expected_url.rstrip('/') == actual_url.rstrip('/') else "❌ No Access"
+
+def click_step(driver, step, csv_row, timer, step_log):
+    with timer.phase("locate"):
+        target = find_element(driver, step["selector_type"], step["selector_value"], step.get("index", 0))
+    with timer.phase("action"):
+        target.click()
+    step_log["status"] = "✅ Clicked"
+    with timer.phase("settle"):
+        wait_for_page_ready(driver)
+    return target
+
+def input_step(driver, step, csv_row, timer, step_log):
+    # Hidden <input type=file> fields still take keys, but a disabled field doesn't
+    with timer.phase("locate"):
+        target = find_element(driver, step["selector_type"], step["selector_value"], step.get("index", 0),
+                              interactable=False, enabled=True)
+    value = substitute_placeholders(step["text"], csv_row)
+    with timer.phase("action"):
+        target.clear()
+        target.send_keys(value)
+    step_log["status"] = f"✅ Input '{value}'"
+    return target
+
+def assert_step(driver, step, csv_row, timer, step_log):
+    assertions = substitute_placeholders(step_assertions(step), csv_row)
+    with timer.phase("action"):
+        results = run_assertions(driver, assertions, timeout=step.get("assert_timeout", ASSERT_TIMEOUT))
+    step_log["assertions"] = results
+    failed = [result for result in results if not result["passed"]]
+    if not results:
+        step_log["status"] = "❌ No assertions"
+    elif failed:
+        step_log["status"] = f"❌ {len(failed)}/{len(results)} assertions failed: " + "; ".join(
+            f"{result['assertion']} (actual: {result.get('reason') or result.get('actual')})" for result in failed)
+    else:
+        step_log["status"] = f"✅ Asserted {len(results)}: " + "; ".join(result["assertion"] for result in results)
+
+def select_dropdown_step(driver, step, csv_row, timer, step_log):
+    with timer.phase("locate"):
+        target = find_element(driver, step["selector_type"], step["selector_value"], step.get("index", 0))
+    with timer.phase("action"):
+        target.click()
+
+    expected_text = substitute_placeholders(step["text"], csv_row).strip()
+    with timer.phase("locate"):
+        match = find_menu_item(driver, expected_text)
+    if match.get("ok"):
+        with timer.phase("action"):
+            match["value"]["element"].click()
+        step_log["status"] = f"✅ Selected '{match['value']['text']}'"
+        with timer.phase("settle"):
+            wait_for_page_ready(driver)
+    else:
+        step_log["status"] = f"❌ Dropdown item '{expected_text}' not found ({match.get('reason')})"
+    return target
+
+def http_step(driver, step, csv_row, timer, step_log):
+    method = step.get("method", "GET").upper()
+    if not http_available():
+        step_log["status"] = f"❌ {MISSING_REQUESTS}"
+        return
+    url = substitute_placeholders(step["url"], csv_row)
+    with timer.phase("action"):
+        response = send_request(driver, method, url, headers=substitute_placeholders(step.get("headers"), csv_row),
+                                body=substitute_placeholders(step.get("body"), csv_row),
+                                timeout=step.get("timeout", HTTP_TIMEOUT))
+    step_log["actual_url"] = response.url
+    step_log["http_status"] = response.status_code
+    expected_status = step.get("expected_status")
+    if expected_status and response.status_code != int(expected_status):
+        step_log["status"] = f"❌ {method} returned {response.status_code}, expected {expected_status}: {response_excerpt(response)}"
+        return
+    if not expected_status and not response.ok:
+        step_log["status"] = f"❌ {method} returned {response.status_code}: {response_excerpt(response)}"
+        return
+    variables = {}
+    if step.get("extract"):
+        try:
+            data = response.json()
+            for name, path in step["extract"].items():
+                variables[name] = variable_text(json_path(data, path))
+        except ValueError as e:
+            step_log["status"] = f"❌ {method} {response.status_code}, extract failed: {e}"
+            return
+        step_log["variables"] = variables
+    step_log["status"] = f"✅ {method} {response.status_code}" + (
+        " (" + ", ".join(f"{name}={value}" for name, value in variables.items()) + ")" if variables else "")
+
+STEP_ACTIONS = {
+    "visit": visit_step,
+    "click": click_step,
+    "input": input_step,
+    "assert": assert_step,
+    "select_dropdown": select_dropdown_step,
+    "http": http_step,
+}
+
+# Run one step on driver and return its step_log; raises on hard failures
+# such as a missing element (failed assertions only fail the step)
+# screenshot_policy (optional): a ScreenshotPolicy for this run; without one
+# every step is captured
+def execute_step(driver, step, csv_row=None, screenshot_policy=None):
+    action = step["action"]
+    wait_time = step.get("wait", 0)
+    index = step.get("index", 0)
+    screenshot_policy = screenshot_policy or ScreenshotPolicy()
+    timer = PhaseTimer()
+    # Element the step acted on, for screenshots clipped to it
+    target = None
+    #driver.refresh()
+    step_log = {
+        "action": action,
+        "selector_type": step.get("selector_type", ""),
+        "selector_value": step.get("selector_value", ""),
+        "url": step.get("url", ""),
+        "text": step.get("text", ""),
+        "index": index,
+        "wait_time": wait_time,
+        "actual_url": "",
+        "status": "",
+        "notifications": [],
+        "screenshot": ""
+    }
+
+    handler = STEP_ACTIONS.get(action)
+    if handler is not None:
+        target = handler(driver, step, csv_row, timer, step_log)
+
+    notifications = []
+    if action in NOTIFYING_ACTIONS:
+        # Toasts stay open until after the screenshot so they show up in it
+        with timer.phase("notify"):
+            notifications = capture_notification(driver, dismiss=False)
+        if notifications:
+            step_log["notifications"] = notifications
+            if any("success" in str(n).lower() for n in notifications):
+                step_log["status"] = "✅ Success"
+            else:
+                step_log["status"] = "❌ Failed"
+    blocked = count_blocked_requests(driver)
+    if blocked is not None:
+        step_log["blocked_requests"] = blocked
+    if screenshot_policy.should_capture(step, step_log["status"]):
+        clip_element = target if screenshot_policy.clip_for(step) == "element" else None
+        with timer.phase("screenshot"):
+            step_log["screenshot"] = capture_screenshot(driver, policy=screenshot_policy, element=clip_element)
+    if notifications:
+        with timer.phase("notify"):
+            dismiss_toasts(driver)
+
+    if csv_row is not None and "LoginEmail" in csv_row:
+        step_log["LoginEmail"] = csv_row["LoginEmail"]
+    # "wait" is an upper bound for the page to settle, not a fixed sleep
+    if wait_time > 0:
+        with timer.phase("wait"):
+            wait_for_page_ready(driver, timeout=wait_time)
+    step_log.update(timer.as_log())
+    return step_log
+
+# Step log standing in for a login block whose session was restored
+def restored_login_log(driver, login_steps, csv_row):
+    restored_log = {
+        "action": "login",
+        "actual_url": driver.current_url,
+        "status": f"✅ Restored session ({len(login_steps)} login steps skipped)",
+        "notifications": []
+    }
+    if csv_row is not None and "LoginEmail" in csv_row:
+        restored_log["LoginEmail"] = csv_row["LoginEmail"]
+    return restored_log
+
+# session_pool (optional): a SessionPool to borrow a warm browser from instead
+# of launching and quitting one per repeat
+# auth_cache (optional): an AuthCache used to skip the login block for users
+# who already logged in during this run
+# screenshot_mode / screenshot_every_n / screenshot_format / screenshot_quality /
+# screenshot_scale / screenshot_clip / screenshot_dedup_bits: run-wide ScreenshotPolicy settings
+# load_profile: run-wide resource blocking; a test case's own "load_profile" overrides it
+# on_step (optional): called with each step_log as soon as it is produced
+def run_test_case(test_case, headless=True, repeat=1, csv_row=None, browser="chrome", session_pool=None, auth_cache=None,
+                  screenshot_mode="always", screenshot_every_n=5, screenshot_format="png", screenshot_quality=70,
+                  screenshot_scale=1.0, screenshot_clip="viewport", screenshot_dedup_bits=0, load_profile="full",
+                  on_step=None):
+    logs_output = []
+
+    def record(log):
+        logs_output.append(log)
+        if on_step is not None:
+            on_step(log)
+
+    case_profile = test_case.get("load_profile") or load_profile
+    for _ in range(repeat):
+        driver = None
+        screenshot_policy = ScreenshotPolicy(screenshot_mode, screenshot_every_n, screenshot_format,
+                                             screenshot_quality, screenshot_scale, screenshot_clip,
+                                             screenshot_dedup_bits)
+        try:
+            if session_pool is not None:
+                driver = session_pool.acquire()
+            else:
+                driver = create_driver(headless=headless, browser=browser, load_profile=load_profile)
+            if case_profile != load_profile:
+                apply_load_profile(driver, case_profile)
+            run_memory = RunMemory(driver)
+
+            steps = test_case["steps"]
+            login_key = None
+            login_end = -1
+            if auth_cache is not None:
+                login_steps, remaining_steps = auth_cache.split(steps)
+                if login_steps:
+                    login_key = auth_cache.key_for(login_steps, csv_row)
+                    if auth_cache.restore(driver, login_key):
+                        record(restored_login_log(driver, login_steps, csv_row))
+                        steps = remaining_steps
+                        login_key = None
+                    else:
+                        login_end = len(login_steps) - 1
+
+            variables = {}
+            for step_number, step in enumerate(steps):
+                step_log = execute_step(driver, step, with_variables(csv_row, variables), screenshot_policy=screenshot_policy)
+                variables.update(step_log.get("variables") or {})
+                step_log.update(run_memory.sample())
+                record(step_log)
+                if step_number == login_end and step_log["status"].startswith("✅"):
+                    auth_cache.save(driver, login_key)
+
+            if session_pool is not None:
+                if case_profile != load_profile:
+                    apply_load_profile(driver, load_profile)
+                session_pool.release(driver)
+            else:
+                driver.quit()
+        except Exception as e:
+            error_log = {"status": f"❌ Error: {e}"}
+            if driver is not None and screenshot_mode != "never":
+                try:
+                    error_log["screenshot"] = capture_screenshot(driver, policy=screenshot_policy)
+                except Exception:
+                    pass
+            record(error_log)
+            if session_pool is not None and driver is not None:
+                # release() resets the browser and recycles it if the reset fails
+                if case_profile != load_profile:
+                    apply_load_profile(driver, load_profile)
+                session_pool.release(driver)
+            else:
+                try:
+                    driver.quit()
+                except:
+                    pass
+    # Callers read the files straight away (UI, Excel export, other processes)
+    flush_screenshots()
+    return logs_output
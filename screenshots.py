@@ -0,0 +1,239 @@
+import atexit
+import base64
+import hashlib
+import io
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from PIL import Image
+
+# Screenshot capture and persistence.
+# Captures are taken as in-memory PNG bytes and written to SCREENSHOT_DIR by a
+# background thread pool, so disk writes stay off the step's critical path.
+# A ScreenshotPolicy decides per step whether a capture is taken at all, and
+# how: on Chrome/Edge the DevTools protocol can return JPEG/WebP at a chosen
+# quality and scale, clipped to the acted-on element or the visible viewport.
+# Files are named by a hash of their content, so identical frames are stored
+# once and shared by every step log that references them; optionally, frames
+# whose perceptual hash is within a few bits of a recent frame reuse it too.
+
+timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+SCREENSHOT_DIR = "screenshots"
+os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+
+SCREENSHOT_MODES = ["always", "on_failure", "every_n", "on_status_change", "never"]
+SCREENSHOT_FORMATS = ["png", "jpeg", "webp"]
+SCREENSHOT_CLIPS = ["viewport", "element"]
+# Space kept around an element when clipping to it, in CSS pixels
+CLIP_PADDING = 16
+WRITER_THREADS = 2
+# How many recent frames a new capture is compared with for near-duplicates
+RECENT_FRAMES = 8
+
+# Viewport, or element box plus padding, in page coordinates as CDP expects
+CLIP_JS = """
+var el = arguments[0], pad = arguments[1];
+var sx = window.scrollX, sy = window.scrollY;
+var vw = document.documentElement.clientWidth || window.innerWidth;
+var vh = document.documentElement.clientHeight || window.innerHeight;
+if (!el) { return { x: sx, y: sy, width: vw, height: vh }; }
+var r = el.getBoundingClientRect();
+var left = Math.max(r.left - pad, 0), top = Math.max(r.top - pad, 0);
+var right = Math.min(r.right + pad, vw), bottom = Math.min(r.bottom + pad, vh);
+if (right <= left || bottom <= top) { return { x: sx, y: sy, width: vw, height: vh }; }
+return { x: sx + left, y: sy + top, width: right - left, height: bottom - top };
+"""
+
+class ScreenshotPolicy:
+    # mode: one of SCREENSHOT_MODES; a step's own "screenshot" value overrides it
+    # image_format / quality / scale / clip: how the capture is encoded; a
+    # step's own "screenshot_clip" value overrides clip
+    # dedup_bits: perceptual-hash distance (out of 64) under which a frame
+    # reuses a recent one; 0 only shares byte-identical frames
+    def __init__(self, mode="always", every_n=5, image_format="png", quality=70, scale=1.0, clip="viewport",
+                 dedup_bits=0):
+        self.mode = mode
+        self.every_n = max(int(every_n or 1), 1)
+        self.image_format = image_format
+        self.quality = int(quality)
+        self.scale = float(scale)
+        self.clip = clip
+        self.dedup_bits = int(dedup_bits or 0)
+        self.step_count = 0
+        self.last_outcome = None
+
+    def mode_for(self, step):
+        return step.get("screenshot") or self.mode
+
+    def clip_for(self, step):
+        return step.get("screenshot_clip") or self.clip
+
+    # Called once per step with its final status
+    def should_capture(self, step, status):
+        mode = self.mode_for(step)
+        self.step_count += 1
+        outcome = str(status).startswith("❌")
+        changed = outcome != self.last_outcome
+        self.last_outcome = outcome
+        if mode == "always":
+            return True
+        if mode == "on_failure":
+            return outcome
+        if mode == "every_n":
+            return self.step_count % self.every_n == 0
+        if mode == "on_status_change":
+            return changed
+        return False
+
+class ScreenshotWriter:
+    def __init__(self, threads=WRITER_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="screenshot-writer")
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def save(self, data, path):
+        future = self.executor.submit(self._write, data, path)
+        with self.lock:
+            self.pending[future] = path
+        future.add_done_callback(self._done)
+        return path
+
+    # Block until every queued screenshot is on disk
+    def flush(self):
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+
+    def is_pending(self, path):
+        with self.lock:
+            return path in self.pending.values()
+
+    def _done(self, future):
+        with self.lock:
+            self.pending.pop(future, None)
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown(wait=True)
+
+    @staticmethod
+    def _write(data, path):
+        # Write then rename, so a worker process writing the same frame never
+        # leaves a half-written file behind
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error saving screenshot {path}: {e}")
+
+# 64-bit difference hash: close frames differ in only a few bits
+def perceptual_hash(data):
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("L", (64, 64))
+        small = img.convert("L").resize((9, 8))
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+class ScreenshotStore:
+    def __init__(self, writer, directory=SCREENSHOT_DIR):
+        self.writer = writer
+        self.directory = directory
+        self.recent = deque(maxlen=RECENT_FRAMES)
+        os.makedirs(directory, exist_ok=True)
+
+    # Queued or on disk; reports delete screenshots once exported
+    def _available(self, path):
+        return self.writer.is_pending(path) or os.path.exists(path)
+
+    # Store a frame and return the path step logs should reference
+    def put(self, data, extension, dedup_bits=0):
+        digest = hashlib.sha256(data).hexdigest()[:24]
+        path = f"{self.directory}/{digest}.{extension}"
+        if self._available(path):
+            return path
+        if dedup_bits:
+            fingerprint = perceptual_hash(data)
+            for recent_fingerprint, recent_path in self.recent:
+                if bin(fingerprint ^ recent_fingerprint).count("1") <= dedup_bits and self._available(recent_path):
+                    return recent_path
+            self.recent.append((fingerprint, path))
+        return self.writer.save(data, path)
+
+# Run option names that make up a ScreenshotPolicy (see run_test_case)
+SCREENSHOT_OPTION_NAMES = ("screenshot_mode", "screenshot_every_n", "screenshot_format",
+                           "screenshot_quality", "screenshot_scale", "screenshot_clip", "screenshot_dedup_bits")
+
+def policy_from_options(options):
+    return ScreenshotPolicy(*(options[name] for name in SCREENSHOT_OPTION_NAMES))
+
+# One writer and store per process
+_writer = None
+_store = None
+
+def get_screenshot_writer():
+    global _writer
+    if _writer is None:
+        _writer = ScreenshotWriter()
+        atexit.register(_writer.close)
+    return _writer
+
+def get_screenshot_store():
+    global _store
+    if _store is None:
+        _store = ScreenshotStore(get_screenshot_writer())
+    return _store
+
+# Keep this process's frames in directory instead (a worker daemon slot gets
+# its own, so no other process shares or deletes its files)
+def use_screenshot_dir(directory):
+    global _store
+    _store = ScreenshotStore(get_screenshot_writer(), directory)
+    return _store
+
+def _uses_cdp(policy, element):
+    return policy.image_format != "png" or policy.scale != 1.0 or element is not None
+
+# Page.captureScreenshot with format/quality/scale and a clip rectangle
+def _capture_cdp(driver, policy, element):
+    clip = driver.execute_script(CLIP_JS, element, CLIP_PADDING)
+    clip["scale"] = policy.scale
+    params = {"format": policy.image_format, "clip": clip, "captureBeyondViewport": False}
+    if policy.image_format != "png":
+        params["quality"] = policy.quality
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+    return base64.b64decode(result["data"])
+
+# Grab the current viewport (or element, with a policy clipping to it) and
+# hand it to the store; returns the file path
+def capture_screenshot(driver, policy=None, element=None, store=None):
+    store = store or get_screenshot_store()
+    policy = policy or ScreenshotPolicy()
+    data, extension = None, "png"
+    if _uses_cdp(policy, element) and hasattr(driver, "execute_cdp_cmd"):
+        # A clicked element may be gone after navigating; fall back to the viewport
+        for clip_element in ([element, None] if element is not None else [None]):
+            try:
+                data = _capture_cdp(driver, policy, clip_element)
+                extension = "jpg" if policy.image_format == "jpeg" else policy.image_format
+                break
+            except Exception as e:
+                error = e
+        if data is None:
+            print(f"Error capturing compressed screenshot, using PNG: {error}")
+    if data is None:
+        data = driver.get_screenshot_as_png()
+        extension = "png"
+    return store.put(data, extension, policy.dedup_bits)
+
+def flush_screenshots():
+    if _writer is not None:
+        _writer.flush()
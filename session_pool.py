@@ -0,0 +1,121 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+from runner import create_driver
+from memory import browser_rss_mb
+
+# Keeps warm browsers alive between runs so launch cost is paid once per worker.
+# A browser is reset (cookies, storage, extra tabs) before it is handed out
+# again, and recycled once it has been used max_uses times, is older than
+# max_age seconds or its processes use more than max_rss_mb. Safe to share
+# between threads (see parallel_runner.run_jobs_threaded).
+
+RESET_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+# http(s) origins in the current tab's back/forward history
+def visited_origins(driver):
+    entries = driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+    origins = set()
+    for entry in entries:
+        parts = urlsplit(entry.get("url", ""))
+        if parts.scheme in ("http", "https"):
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+    return origins
+
+class SessionPool:
+    def __init__(self, headless=True, browser="chrome", max_uses=25, max_age=1800, load_profile="full", max_rss_mb=0):
+        self.headless = headless
+        self.browser = browser
+        self.load_profile = load_profile
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.max_rss_mb = max_rss_mb
+        self.idle = []
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    # Hand out a warm browser, launching a new one only if none is idle
+    def acquire(self):
+        while True:
+            with self.lock:
+                driver = self.idle.pop() if self.idle else None
+                if driver is not None and not self._expired(driver):
+                    self.sessions[id(driver)]["uses"] += 1
+                    return driver
+            if driver is None:
+                break
+            self._quit(driver)
+        driver = create_driver(headless=self.headless, browser=self.browser, load_profile=self.load_profile)
+        with self.lock:
+            self.sessions[id(driver)] = {"created": time.monotonic(), "uses": 1}
+        return driver
+
+    # Reset a browser after a run and keep it for the next one
+    def release(self, driver):
+        if self._expired(driver) or not self._reset(driver):
+            self._quit(driver)
+            return
+        with self.lock:
+            self.idle.append(driver)
+
+    # Drop a browser that should not be reused, e.g. after a crash
+    def discard(self, driver):
+        self._quit(driver)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for driver in idle:
+            self._quit(driver)
+
+    def _expired(self, driver):
+        meta = self.sessions.get(id(driver))
+        if meta is None:
+            return True
+        if self.max_uses and meta["uses"] >= self.max_uses:
+            return True
+        if self.max_age and time.monotonic() - meta["created"] > self.max_age:
+            return True
+        if self.max_rss_mb:
+            rss = browser_rss_mb(driver)
+            return rss is not None and rss > self.max_rss_mb
+        return False
+
+    # Cookies of every domain and the storage of every origin the job's tabs
+    # went through (SSO and API hosts included), not just the current page's
+    def _reset(self, driver):
+        try:
+            cdp = hasattr(driver, "execute_cdp_cmd")
+            origins = set()
+            handles = driver.window_handles
+            for handle in reversed(handles):
+                driver.switch_to.window(handle)
+                if cdp:
+                    origins.update(visited_origins(driver))
+                if handle != handles[0]:
+                    driver.close()
+            # Storage is per origin, so clear the current one while still on it
+            driver.execute_script(RESET_STORAGE_JS)
+            if cdp:
+                for origin in origins:
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            else:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Error resetting browser session: {e}")
+            return False
+
+    def _quit(self, driver):
+        with self.lock:
+            self.sessions.pop(id(driver), None)
+        try:
+            driver.quit()
+        except:
+            pass
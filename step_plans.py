@@ -0,0 +1,115 @@
+import functools
+import re
+
+import pandas as pd
+
+# Compiled step plans.
+# Every {{Column}} template in a case is tokenized once into literal text and
+# column names. Expanding a case over a CSV renders each template for all rows
+# at once with pandas string operations, giving one ready-to-run step list per
+# row, and the columns a case needs can be checked against the CSV before any
+# browser starts. Placeholders for values that http steps extract stay in
+# the steps until the run fills them in.
+
+PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}")
+
+# ("literal", "Column", "literal", ...): column names sit at the odd positions
+@functools.lru_cache(maxsize=4096)
+def template_parts(text):
+    return tuple(PLACEHOLDER_RE.split(text))
+
+# Text a CSV value fills in: empty for missing and NaN values; 0 and False are kept
+def placeholder_text(value):
+    return str(value) if value is not None and pd.notna(value) else ''
+
+def render_template(text, csv_row):
+    parts = template_parts(text)
+    if len(parts) == 1:
+        return text
+    get = csv_row.get if isinstance(csv_row, (dict, pd.Series)) else lambda name: None
+    return "".join(part if i % 2 == 0 else placeholder_text(get(part)) for i, part in enumerate(parts))
+
+class Template:
+    def __init__(self, text):
+        self.text = text
+        self.parts = template_parts(text)
+        self.columns = self.parts[1::2]
+
+    # Rendered text for every row of csv_data, in row order; placeholders
+    # named in keep are left for the run to fill in
+    def render_rows(self, csv_data, keep=()):
+        rendered = pd.Series("", index=csv_data.index, dtype=object)
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0 or part in keep:
+                literal = part if i % 2 == 0 else f"{{{{{part}}}}}"
+                rendered = rendered + literal if literal else rendered
+            else:
+                rendered = rendered + column_text(csv_data, part)
+        return rendered.tolist()
+
+def column_text(csv_data, column):
+    if column not in csv_data.columns:
+        return pd.Series("", index=csv_data.index, dtype=object)
+    values = csv_data[column]
+    return values.astype(str).where(values.notna(), "")
+
+# A step with every templated string replaced by a Template
+def compile_value(value):
+    if isinstance(value, list):
+        return [compile_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: compile_value(item) for key, item in value.items()}
+    if isinstance(value, str) and len(template_parts(value)) > 1:
+        return Template(value)
+    return value
+
+def templates_in(value):
+    if isinstance(value, Template):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from templates_in(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from templates_in(item)
+
+def fill_value(value, rendered, row):
+    if isinstance(value, Template):
+        return rendered[value.text][row]
+    if isinstance(value, list):
+        return [fill_value(item, rendered, row) for item in value]
+    if isinstance(value, dict):
+        return {key: fill_value(item, rendered, row) for key, item in value.items()}
+    return value
+
+class CompiledCase:
+    def __init__(self, case):
+        self.case = case
+        self.steps = [compile_value(step) for step in case["steps"]]
+        self.templates = {template.text: template for step in self.steps for template in templates_in(step)}
+        # Placeholders filled at run time from values http steps extract
+        self.variables = {name for step in case["steps"] if step.get("action") == "http"
+                          for name in (step.get("extract") or {})}
+        self.columns = sorted({column for template in self.templates.values() for column in template.columns
+                               if column not in self.variables})
+        # Steps without templates are shared by every row as they are
+        self.templated = [any(True for _ in templates_in(step)) for step in self.steps]
+
+    # One substituted step list per row of csv_data, in row order
+    def expand(self, csv_data):
+        rendered = {text: template.render_rows(csv_data, self.variables) for text, template in self.templates.items()}
+        return [
+            [fill_value(compiled, rendered, row) if templated else step
+             for step, compiled, templated in zip(self.case["steps"], self.steps, self.templated)]
+            for row in range(len(csv_data))
+        ]
+
+# {case name: [placeholders with no CSV column]} for the cases that have any
+def missing_placeholders(test_cases, csv_columns):
+    columns = set(csv_columns)
+    missing = {}
+    for case in test_cases:
+        unknown = [column for column in CompiledCase(case).columns if column not in columns]
+        if unknown:
+            missing[case["name"]] = unknown
+    return missing
@@ -0,0 +1,35 @@
+from durations import DEFAULT_STEP_SECONDS, DurationHistory, estimate_makespan, longest_first
+
+def make_job(name, steps=1, row=None):
+    return {"case": {"name": name, "steps": [{"action": "visit"}] * steps}, "csv_row": row, "row_index": 0,
+            "repeat_index": 0}
+
+def test_longest_first_orders_by_estimate(tmp_path):
+    history = DurationHistory(str(tmp_path / "history.json"))
+    jobs = [make_job("Short"), make_job("Long"), make_job("New", steps=3), make_job("Long", row={"Name": "B"})]
+    history.record(jobs[0], [{"total_ms": 1000}])
+    history.record(jobs[1], [{"total_ms": 20000}, {"total_ms": 10000}])
+
+    # Unknown rows of a known case fall back to the case's average
+    assert history.estimate(jobs[3]) == 30
+    assert history.estimate(jobs[2]) == 3 * DEFAULT_STEP_SECONDS
+    assert longest_first(jobs, history) == [1, 3, 2, 0]
+
+def test_longest_first_shortens_the_makespan(tmp_path):
+    history = DurationHistory(str(tmp_path / "history.json"))
+    jobs = [make_job(name) for name in ("A", "B", "C")]
+    for job, seconds in zip(jobs, (1, 1, 2)):
+        history.record(job, [{"total_ms": seconds * 1000}])
+
+    assert estimate_makespan(jobs, history, workers=2) == 3
+    assert estimate_makespan(jobs, history, workers=2, schedule=longest_first(jobs, history)) == 2
+
+def test_history_survives_a_save(tmp_path):
+    path = str(tmp_path / "history.json")
+    history = DurationHistory(path)
+    job = make_job("Case")
+    history.record(job, [{"total_ms": 10000}])
+    history.record(job, [{"total_ms": 20000}])
+    history.save()
+
+    assert DurationHistory(path).estimate(job) == 13
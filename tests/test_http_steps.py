@@ -0,0 +1,26 @@
+import pytest
+
+from http_steps import json_path, variable_text
+
+RESPONSE = {"data": {"id": 42, "active": False, "items": [{"id": 0}, {"id": 7}], "name with spaces": "x",
+                     "parent": None}}
+
+def test_json_path_lookups():
+    assert json_path(RESPONSE, "$.data.id") == 42
+    assert json_path(RESPONSE, "$.data.items[1].id") == 7
+    assert json_path(RESPONSE, "$.data['name with spaces']") == "x"
+    assert json_path(RESPONSE, "$") is RESPONSE
+
+def test_json_path_errors():
+    with pytest.raises(ValueError, match="must start with"):
+        json_path(RESPONSE, "data.id")
+    with pytest.raises(ValueError, match="not found"):
+        json_path(RESPONSE, "$.data.items[5].id")
+    with pytest.raises(ValueError, match="Invalid JSON path"):
+        json_path(RESPONSE, "$.data..id")
+
+def test_extracted_values_as_placeholder_text():
+    assert variable_text(json_path(RESPONSE, "$.data.items[0].id")) == 0
+    assert variable_text(json_path(RESPONSE, "$.data.active")) is False
+    assert variable_text(json_path(RESPONSE, "$.data.parent")) == ""
+    assert variable_text(json_path(RESPONSE, "$.data.items[1]")) == '{"id": 7}'
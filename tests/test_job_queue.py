@@ -0,0 +1,43 @@
+import job_queue
+from job_queue import JobQueue
+
+def make_jobs(names):
+    return [{"case": {"name": name, "steps": []}, "csv_row": None, "row_index": None, "repeat_index": 0}
+            for name in names]
+
+def test_jobs_are_leased_in_schedule_order(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    run_id = queue.submit(make_jobs(["A", "B", "C"]), {"headless": True}, schedule=[2, 0, 1])
+
+    claims = [queue.claim("worker-1") for _ in range(4)]
+
+    assert [claim[1]["case"]["name"] for claim in claims[:3]] == ["C", "A", "B"]
+    assert claims[0][2] == {"headless": True}
+    assert claims[3] is None
+    assert queue.pending(run_id) == {0: "running", 1: "running", 2: "running"}
+
+def test_completed_jobs_are_collected_once(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    run_id = queue.submit(make_jobs(["A", "B"]), {})
+    job_id, _, _ = queue.claim("worker-1")
+
+    assert queue.complete(job_id, "worker-1", [{"status": "✅ Success"}], {"screenshots/a.png": b"png"})
+
+    assert queue.collect(run_id) == {0: [{"status": "✅ Success"}]}
+    assert queue.collect(run_id) == {}
+    assert queue.pending(run_id) == {1: "queued"}
+    assert queue.screenshot(run_id, "screenshots/a.png") == b"png"
+
+def test_expired_lease_is_requeued_and_the_old_worker_is_ignored(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    run_id = queue.submit(make_jobs(["A"]), {})
+    job_id, _, _ = queue.claim("worker-1")
+    assert queue.claim("worker-2") is None
+
+    monkeypatch.setattr(job_queue, "LEASE_SECONDS", -1)
+    reclaimed = queue.claim("worker-2")
+
+    assert reclaimed[0] == job_id
+    assert not queue.complete(job_id, "worker-1", [{"status": "✅ late"}], {})
+    assert queue.complete(job_id, "worker-2", [{"status": "✅ Success"}], {})
+    assert queue.collect(run_id) == {0: [{"status": "✅ Success"}]}
@@ -0,0 +1,174 @@
+import copy
+from urllib.parse import urlsplit
+
+import planner
+from auth_cache import READ_STORAGE_JS, WRITE_STORAGE_JS
+from navigation import HASH_NAVIGATE_JS, navigate
+from planner import build_plan_trees, run_plan_node
+from runner import substitute_placeholders
+from session_pool import RESET_STORAGE_JS
+
+# A hash-routed app that reads who is signed in from localStorage when the
+# page loads and then keeps it in memory, like the real SPA
+class FakeDriver:
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.cookies = []
+        self.storage = {"local": {}, "session": {}}
+        self.signed_in = None
+        self.saved = []
+        self.down = False
+
+    def _load(self, url):
+        self.current_url = url
+        self.signed_in = self.storage["local"].get("user")
+
+    def get(self, url):
+        # Same document with another #fragment: the browser doesn't reload
+        if urlsplit(url)._replace(fragment="") == urlsplit(self.current_url)._replace(fragment=""):
+            self.current_url = url
+        else:
+            self._load(url)
+
+    def refresh(self):
+        self._load(self.current_url)
+
+    def execute_script(self, script, *args):
+        if script == HASH_NAVIGATE_JS:
+            self.current_url = self.current_url.split("#")[0] + "#" + args[0]
+        elif script == READ_STORAGE_JS:
+            return copy.deepcopy(self.storage)
+        elif script == RESET_STORAGE_JS:
+            self.storage = {"local": {}, "session": {}}
+        elif script == WRITE_STORAGE_JS:
+            for area in ("local", "session"):
+                self.storage[area].update(args[0][area])
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+# Steps of the fake app: the login form is only there when nobody is signed in
+def fake_execute_step(driver, step, csv_row=None, screenshot_policy=None):
+    action = step["action"]
+    if action == "visit":
+        navigate(driver, step["url"], hard_reload=step.get("hard_reload", False))
+        status = "❌ No Access" if driver.down else "✅ Success"
+    elif action == "click":
+        driver.saved.append(step["selector_value"])
+        status = "✅ Clicked"
+    elif action == "outage":
+        driver.down = True
+        status = "✅ Down"
+    elif action == "sign_in":
+        if driver.signed_in:
+            status = f"❌ Already signed in as {driver.signed_in}"
+        else:
+            driver.signed_in = substitute_placeholders(step["text"], csv_row)
+            driver.storage["local"]["user"] = driver.signed_in
+            status = "✅ Signed in"
+    else:
+        status = f"✅ {driver.signed_in}"
+    return {"action": action, "status": status}
+
+def test_rewind_between_users_reloads_the_app(monkeypatch):
+    monkeypatch.setattr(planner, "execute_step", fake_execute_step)
+    case = {"name": "Dashboard", "steps": [
+        {"action": "visit", "url": "http://app.test/#/login"},
+        {"action": "sign_in", "text": "{{LoginEmail}}"},
+        {"action": "visit", "url": "http://app.test/#/dashboard"},
+        {"action": "whoami"},
+    ]}
+    jobs = [{"case": case, "csv_row": {"LoginEmail": email}, "row_index": i, "repeat_index": 0}
+            for i, email in enumerate(["a@example.com", "b@example.com"])]
+    (root,) = build_plan_trees(jobs)
+
+    results = run_plan_node(FakeDriver(), root)
+
+    assert [log["status"] for log in results[0]] == ["✅ Success", "✅ Signed in", "✅ Success", "✅ a@example.com"]
+    assert [log["status"] for log in results[1]] == ["✅ Success", "✅ Signed in", "✅ Success", "✅ b@example.com"]
+
+def make_jobs(steps, rows):
+    case = {"name": "Case", "steps": steps}
+    return [{"case": case, "csv_row": row, "row_index": i, "repeat_index": 0} for i, row in enumerate(rows)]
+
+def test_branch_after_a_click_is_not_replayed(monkeypatch):
+    monkeypatch.setattr(planner, "execute_step", fake_execute_step)
+    jobs = make_jobs([
+        {"action": "visit", "url": "http://app.test/#/brokers/new"},
+        {"action": "click", "selector_type": "id", "selector_value": "save"},
+        {"action": "input", "text": "{{Name}}"},
+    ], [{"Name": "A"}, {"Name": "B"}])
+    (root,) = build_plan_trees(jobs)
+
+    # The second job leaves the shared path above the save click
+    assert len(root.children) == 2
+    results = run_plan_node(FakeDriver(), root)
+
+    assert [len(results[0]), len(results[1])] == [3, 3]
+    assert [log["status"] for log in results[1]][:2] == ["✅ Success", "✅ Clicked"]
+
+def test_failed_replay_aborts_the_branch(monkeypatch):
+    monkeypatch.setattr(planner, "execute_step", fake_execute_step)
+    visit = {"action": "visit", "url": "http://app.test/#/brokers"}
+    jobs = [{"case": {"name": name, "steps": [visit, {"action": name}]}, "csv_row": None, "row_index": None,
+             "repeat_index": 0} for name in ("outage", "whoami")]
+    (root,) = build_plan_trees(jobs)
+
+    results = run_plan_node(FakeDriver(), root)
+
+    assert results[0][-1]["status"] == "✅ Down"
+    assert results[1][0]["status"] == "✅ Success"
+    assert results[1][-1]["status"].startswith("❌ Error: Replaying visit step")
+
+# Login sessions kept in memory, keyed like auth_cache.AuthCache
+class FakeAuthCache:
+    def __init__(self):
+        self.sessions = {}
+        self.restored = 0
+
+    def save(self, driver, key):
+        self.sessions[key] = (driver.current_url, copy.deepcopy(driver.storage))
+
+    def restore(self, driver, key):
+        if key not in self.sessions:
+            return False
+        url, driver.storage = copy.deepcopy(self.sessions[key])
+        driver._load(url)
+        self.restored += 1
+        return True
+
+def test_planned_run_restores_logins_and_streams_steps(monkeypatch):
+    auth_cache = FakeAuthCache()
+    monkeypatch.setattr(planner, "execute_step", fake_execute_step)
+    monkeypatch.setattr(planner, "create_driver", lambda **options: FakeDriver())
+    monkeypatch.setattr(planner, "get_auth_cache", lambda run_options: auth_cache)
+    jobs = make_jobs([
+        {"action": "visit", "url": "http://app.test/#/sign-in", "login": True},
+        {"action": "sign_in", "text": "{{LoginEmail}}", "login": True},
+        {"action": "visit", "url": "http://app.test/#/{{Page}}"},
+        {"action": "whoami"},
+    ], [{"LoginEmail": "a@example.com", "Page": "brokers"}, {"LoginEmail": "a@example.com", "Page": "loans"}])
+    streamed = {0: [], 1: []}
+
+    results = list(planner.run_planned(jobs, reuse_sessions=False, reuse_logins=True, screenshot_mode="never",
+                                       on_step=lambda job_index, log: streamed[job_index].append(log)))
+
+    # The second branch rewinds to before the login and restores the session
+    assert auth_cache.restored == 1
+    for job_index, (job, logs) in enumerate(results):
+        assert [log["status"] for log in logs] == ["✅ Success", "✅ Signed in", "✅ Success", "✅ a@example.com"]
+        assert streamed[job_index] == logs
+
+def test_cases_with_their_own_load_profile_get_their_own_tree():
+    jobs = make_jobs([{"action": "visit", "url": "http://app.test/#/brokers"}], [None, None])
+    jobs[1]["case"] = dict(jobs[1]["case"], load_profile="functional")
+
+    roots = build_plan_trees(jobs, load_profile="full")
+
+    assert [root.load_profile for root in roots] == ["full", "functional"]
@@ -0,0 +1,57 @@
+from rerun import RerunStream, plan_reruns
+from run_log import RunLog, load_run_report, save_manifest
+
+LOGIN = [
+    {"action": "visit", "url": "http://app.test/#/login", "login": True},
+    {"action": "input", "text": "{{LoginEmail}}", "login": True},
+]
+CASE = {"name": "Brokers", "steps": LOGIN + [
+    {"action": "visit", "url": "http://app.test/#/brokers"},
+    {"action": "click", "selector_type": "id", "selector_value": "new"},
+    {"action": "visit", "url": "http://app.test/#/brokers/new"},
+    {"action": "assert", "selector_type": "id", "selector_value": "title"},
+]}
+
+def write_run(path, outcomes):
+    jobs = [{"case": CASE, "csv_row": {"LoginEmail": f"{i}@example.com"}, "row_index": i, "repeat_index": 0}
+            for i in range(len(outcomes))]
+    save_manifest(path, jobs)
+    with RunLog(path) as run_log:
+        for job_index, statuses in enumerate(outcomes):
+            for step, status in zip(CASE["steps"], statuses):
+                run_log.append(job_index, {"action": step["action"], "status": status})
+
+def test_only_failed_and_unfinished_jobs_are_rerun(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    write_run(path, [["✅"] * 6, ["✅"] * 5 + ["❌ Missing"], []])
+
+    reruns = plan_reruns(path)
+
+    assert [entry["job_index"] for entry in reruns] == [1, 2]
+    assert reruns[0]["job"]["case"]["steps"] == CASE["steps"]
+    assert reruns[0]["carry"] == []
+
+def test_resume_replays_login_then_continues_from_the_last_visit(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    write_run(path, [["✅"] * 5 + ["❌ Missing"]])
+
+    (entry,) = plan_reruns(path, resume=True)
+
+    assert entry["job"]["case"]["steps"] == LOGIN + CASE["steps"][4:]
+    assert entry["login_count"] == 2
+    assert [record["action"] for record in entry["carry"]] == ["visit", "click"]
+
+def test_rerun_attempt_replaces_the_failed_one_in_case_order(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    write_run(path, [["✅"] * 5 + ["❌ Missing"]])
+    reruns = plan_reruns(path, resume=True)
+
+    with RunLog(path) as run_log:
+        stream = RerunStream(reruns, lambda job_index, log: run_log.append(job_index, log, attempt=1))
+        for step in reruns[0]["job"]["case"]["steps"]:
+            stream(0, {"action": step["action"], "status": "✅ again"})
+
+    report = load_run_report(path)
+    assert list(report["action"]) == [step["action"] for step in CASE["steps"]]
+    assert list(report["status"]) == ["✅ again"] * 2 + ["✅"] * 2 + ["✅ again"] * 2
+    assert plan_reruns(path) == []
@@ -0,0 +1,47 @@
+from result_cache import ResultCache, run_with_cache
+
+def make_job(name, text="{{Name}}", row=None, repeat_index=0):
+    case = {"name": name, "steps": [{"action": "visit", "url": "http://app.test/"},
+                                    {"action": "input", "text": text}]}
+    return {"case": case, "csv_row": row if row is not None else {"Name": "A"}, "row_index": 0,
+            "repeat_index": repeat_index}
+
+def test_key_covers_substituted_steps_build_and_repeat(tmp_path):
+    cache = ResultCache("build-1", cache_dir=str(tmp_path))
+
+    assert cache.key_for(make_job("Case")) == cache.key_for(make_job("Other", text="A"))
+    assert cache.key_for(make_job("Case")) != cache.key_for(make_job("Case", row={"Name": "B"}))
+    assert cache.key_for(make_job("Case")) != cache.key_for(make_job("Case", repeat_index=1))
+    assert cache.key_for(make_job("Case")) != ResultCache("build-2", cache_dir=str(tmp_path)).key_for(make_job("Case"))
+
+def test_only_passing_results_are_stored(tmp_path):
+    cache = ResultCache("build-1", cache_dir=str(tmp_path))
+    passing, failing = make_job("Case"), make_job("Case", row={"Name": "B"})
+
+    cache.put(passing, [{"status": "✅ Success", "screenshot": "screenshots/a.png"}])
+    cache.put(failing, [{"status": "❌ No Access"}])
+
+    assert [log["status"] for log in cache.get(passing)] == ["✅ Success"]
+    assert "screenshot" not in cache.get(passing)[0]
+    assert cache.get(failing) is None
+
+def test_run_with_cache_keeps_job_order(tmp_path):
+    cache = ResultCache("build-1", cache_dir=str(tmp_path))
+    jobs = [make_job("Case", row={"Name": name}) for name in "ABCD"]
+    hits = {1: [{"status": "✅ cached B"}], 3: [{"status": "✅ cached D"}]}
+    started = []
+    steps = []
+
+    def start(pending, on_step):
+        started.extend(job["csv_row"]["Name"] for job in pending)
+        for position, job in enumerate(pending):
+            on_step(position, {"status": "✅ ran " + job["csv_row"]["Name"]})
+        return iter((job, [{"status": "✅ ran " + job["csv_row"]["Name"]}]) for job in pending)
+
+    results = list(run_with_cache(jobs, hits, start, cache, on_step=lambda job_index, log: steps.append(job_index)))
+
+    assert started == ["A", "C"]
+    assert [logs[0]["status"] for _, logs in results] == ["✅ ran A", "✅ cached B", "✅ ran C", "✅ cached D"]
+    # Hits stream first, then pending steps under their original job index
+    assert steps == [1, 3, 0, 2]
+    assert cache.get(jobs[2]) is not None
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from runner import substitute_placeholders
+from step_plans import CompiledCase, missing_placeholders
+
+CASE = {"name": "Brokers", "steps": [
+    {"action": "visit", "url": "http://app.test/#/brokers"},
+    {"action": "input", "selector_type": "id", "selector_value": "name", "text": "{{Name}} ({{Code}})"},
+    {"action": "http", "method": "POST", "url": "/api/brokers", "extract": {"BrokerId": "$.data.id"}},
+    {"action": "visit", "url": "http://app.test/#/brokers/{{BrokerId}}"},
+]}
+
+def test_expand_matches_row_by_row_substitution():
+    csv_data = pd.DataFrame({"Name": ["Acme", "Zero", None], "Code": [7, 0, 3]})
+
+    expanded = CompiledCase(CASE).expand(csv_data)
+
+    # The last step waits for BrokerId, which the http step extracts at run time
+    assert [steps[:3] for steps in expanded] == [substitute_placeholders(CASE["steps"][:3], row)
+                                                 for _, row in csv_data.iterrows()]
+    assert [steps[1]["text"] for steps in expanded] == ["Acme (7)", "Zero (0)", " (3)"]
+
+def test_steps_without_placeholders_are_shared():
+    expanded = CompiledCase(CASE).expand(pd.DataFrame({"Name": ["A", "B"], "Code": [1, 2]}))
+
+    assert expanded[0][0] is CASE["steps"][0]
+    assert expanded[1][0] is CASE["steps"][0]
+
+def test_extracted_variables_are_left_for_the_run():
+    expanded = CompiledCase(CASE).expand(pd.DataFrame({"Name": ["A"], "Code": [1]}))
+
+    assert expanded[0][3]["url"] == "http://app.test/#/brokers/{{BrokerId}}"
+    assert missing_placeholders([CASE], ["Name"]) == {"Brokers": ["Code"]}
@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Per-step phase timings and run-level latency tables.
+# execute_step times each phase of a step with a monotonic clock and adds one
+# "<phase>_ms" column per phase (plus "total_ms") to the step log. After a run
+# the logs are aggregated into p50/p95/p99 tables per action, selector and
+# test case, shown in the app and exported as extra Excel sheets.
+
+# locate: finding the element (or dropdown item); action: the click/input/
+# navigation/assertion itself; settle: waiting for the page after it;
+# notify: reading and dismissing toasts; screenshot: capture and hand-off;
+# wait: the step's own "wait" bound
+TIMING_PHASES = ("locate", "action", "settle", "notify", "screenshot", "wait")
+TIMING_COLUMNS = [f"{phase}_ms" for phase in TIMING_PHASES] + ["total_ms"]
+PERCENTILES = (0.5, 0.95, 0.99)
+
+class PhaseTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = dict.fromkeys(TIMING_PHASES, 0.0)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - start
+
+    # Step log columns, in milliseconds
+    def as_log(self):
+        log = {f"{name}_ms": round(seconds * 1000, 1) for name, seconds in self.totals.items()}
+        log["total_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return log
+
+# Percentiles of every timing column for each value of by
+def latency_table(logs_df, by):
+    columns = [column for column in TIMING_COLUMNS if column in logs_df.columns]
+    if not columns or by not in logs_df.columns:
+        return pd.DataFrame()
+    timed = logs_df.dropna(subset=["total_ms"])
+    if timed.empty:
+        return pd.DataFrame()
+    grouped = timed.groupby(by)
+    table = pd.DataFrame({"steps": grouped.size()})
+    for column in columns:
+        for percentile in PERCENTILES:
+            table[f"{column} p{int(percentile * 100)}"] = grouped[column].quantile(percentile)
+    return table.round(1).reset_index()
+
+# {sheet name: table} for a run's logs
+def latency_tables(logs_df):
+    if "total_ms" not in logs_df.columns:
+        return {}
+    logs_df = logs_df.copy()
+    if "selector_value" in logs_df.columns:
+        selector = logs_df["selector_type"].fillna("").astype(str) + ": " + logs_df["selector_value"].fillna("").astype(str)
+        if "url" in logs_df.columns:
+            # Visits have no selector; group them by URL instead
+            selector = selector.where(logs_df["selector_value"].fillna("") != "", "url: " + logs_df["url"].fillna("").astype(str))
+        logs_df["selector"] = selector
+    tables = {
+        "Latency by Action": latency_table(logs_df, "action"),
+        "Latency by Selector": latency_table(logs_df, "selector"),
+        "Latency by Test Case": latency_table(logs_df, "test_case"),
+    }
+    return {name: table for name, table in tables.items() if not table.empty}
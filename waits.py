@@ -0,0 +1,165 @@
+import time
+
+# Condition-based waits evaluated inside the page.
+# Each wait is one execute_async_script call that polls in the browser and
+# returns as soon as the condition holds, instead of Python sleeping a fixed
+# time or polling over WebDriver round trips.
+
+PAGE_TIMEOUT = 10
+ELEMENT_TIMEOUT = 10
+POLL_MS = 50
+QUIET_MS = 150
+SCRIPT_TIMEOUT = 60
+
+# Counts in-flight XHR/fetch requests so "network idle" can be checked in-page
+NETWORK_HOOK_JS = """
+(function () {
+    if (window.__tfNet) { return; }
+    var net = window.__tfNet = { pending: 0 };
+    var settle = function () { net.pending = Math.max(0, net.pending - 1); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++;
+        this.addEventListener('loadend', settle);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            net.pending++;
+            return fetch.apply(this, arguments).then(
+                function (r) { settle(); return r; },
+                function (e) { settle(); throw e; });
+        };
+    }
+})();
+"""
+
+# Resolves a selector_type/selector_value pair to a list of elements
+LOCATE_JS = """
+var locate = function (type, value) {
+    var xpath = function (expr) {
+        var snap = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var out = [];
+        for (var i = 0; i < snap.snapshotLength; i++) { out.push(snap.snapshotItem(i)); }
+        return out;
+    };
+    var links = function (match) {
+        return Array.prototype.filter.call(document.querySelectorAll('a'), function (a) {
+            return match((a.innerText || '').trim());
+        });
+    };
+    switch (type) {
+        case 'id': return Array.prototype.slice.call(document.querySelectorAll('#' + CSS.escape(value)));
+        case 'name': return Array.prototype.slice.call(document.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+        case 'css_selector': return Array.prototype.slice.call(document.querySelectorAll(value));
+        case 'class_name': return Array.prototype.slice.call(document.getElementsByClassName(value));
+        case 'tag_name': return Array.prototype.slice.call(document.getElementsByTagName(value));
+        case 'link_text': return links(function (t) { return t === value; });
+        case 'partial_link_text': return links(function (t) { return t.indexOf(value) !== -1; });
+        case 'placeholder': return Array.prototype.filter.call(document.querySelectorAll('[placeholder]'), function (el) {
+            return el.getAttribute('placeholder') === value;
+        });
+        default: return xpath(value);
+    }
+};
+// Displayedness as Selenium judges it: options count as shown when their
+// <select> is, and transparent elements are still shown
+var isVisible = function (el) {
+    var tag = el.tagName.toLowerCase();
+    if (tag === 'option' || tag === 'optgroup') {
+        var select = el.closest('select');
+        return select ? isVisible(select) : false;
+    }
+    if (!el.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+};
+"""
+
+# Shared polling loop; CONDITION is the body of check(args) and must return
+# {ok: true, value: ...} when satisfied or {ok: false, reason: '...'}
+WAIT_TEMPLATE = """
+var done = arguments[arguments.length - 1];
+var timeoutMs = arguments[0], quietMs = arguments[1], args = arguments[2];
+""" + NETWORK_HOOK_JS + LOCATE_JS + """
+var check = function (args) { /*CONDITION*/ };
+var start = Date.now(), okSince = null, last = null;
+(function poll() {
+    var now = Date.now();
+    try { last = check(args); } catch (e) { last = { ok: false, reason: 'error: ' + e.message }; }
+    if (last.ok) {
+        if (okSince === null) { okSince = now; }
+        if (now - okSince >= quietMs) { return done({ ok: true, value: last.value, waited_ms: now - start }); }
+    } else {
+        okSince = null;
+    }
+    if (now - start >= timeoutMs) { return done({ ok: false, reason: last.reason, waited_ms: now - start }); }
+    setTimeout(poll, """ + str(POLL_MS) + """);
+})();
+"""
+
+PAGE_READY_CONDITION = """
+if (document.readyState !== 'complete') { return { ok: false, reason: 'document not ready' }; }
+if (window.__tfNet.pending > 0) { return { ok: false, reason: window.__tfNet.pending + ' pending requests' }; }
+var masks = document.querySelectorAll('.el-loading-mask');
+for (var i = 0; i < masks.length; i++) {
+    if (isVisible(masks[i])) { return { ok: false, reason: 'loading mask visible' }; }
+}
+if (document.querySelector('.Vue-Toastification__container [class*="-enter-active"], .Vue-Toastification__container [class*="-leave-active"]')) {
+    return { ok: false, reason: 'toast animating' };
+}
+return { ok: true };
+"""
+
+ELEMENT_CONDITION = """
+var els = locate(args.type, args.value);
+if (args.index >= els.length) { return { ok: false, reason: els.length + ' matches' }; }
+var el = els[args.index];
+if (args.interactable && !isVisible(el)) { return { ok: false, reason: 'element not visible' }; }
+if (args.enabled && (el.disabled || el.getAttribute('aria-disabled') === 'true')) {
+    return { ok: false, reason: 'element disabled' };
+}
+return { ok: true, value: el };
+"""
+
+# Set up a fresh driver: allow long in-page polls and install the network hook
+# on every new document where the browser supports CDP
+def prepare_driver(driver):
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_HOOK_JS})
+        except Exception as e:
+            print(f"Error installing network hook: {e}")
+
+# Poll condition_js in the page until it holds or timeout (seconds) runs out
+def wait_until(driver, condition_js, args=None, timeout=PAGE_TIMEOUT, quiet_ms=0):
+    script = WAIT_TEMPLATE.replace("/*CONDITION*/", condition_js)
+    timeout = min(timeout, SCRIPT_TIMEOUT - 5)
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining_ms = int(max(deadline - time.monotonic(), 0) * 1000)
+        try:
+            return driver.execute_async_script(script, remaining_ms, quiet_ms, args or {})
+        except Exception as e:
+            # The document was replaced mid-poll (navigation); poll the new one
+            if time.monotonic() >= deadline:
+                return {"ok": False, "reason": str(e).splitlines()[0] if str(e) else "script error"}
+            time.sleep(POLL_MS / 1000)
+
+# Document loaded, no XHR/fetch in flight, no loading mask, toasts settled
+def wait_for_page_ready(driver, timeout=PAGE_TIMEOUT):
+    return wait_until(driver, PAGE_READY_CONDITION, timeout=timeout, quiet_ms=QUIET_MS)
+
+# Element present at index, displayed when interactable is set and enabled
+# when enabled is (by default whenever interactable is)
+def wait_for_element(driver, selector_type, selector_value, index=0, timeout=ELEMENT_TIMEOUT, interactable=True,
+                     enabled=None):
+    enabled = interactable if enabled is None else enabled
+    args = {"type": selector_type, "value": selector_value, "index": index, "interactable": interactable,
+            "enabled": enabled}
+    result = wait_until(driver, ELEMENT_CONDITION, args=args, timeout=timeout)
+    if result.get("ok"):
+        return result["value"]
+    raise Exception(f"No element found at index {index} for {selector_type}: {selector_value} ({result.get('reason')})")
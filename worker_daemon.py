@@ -0,0 +1,81 @@
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+from job_queue import POLL_SECONDS, Heartbeat, JobQueue, collect_screenshots, remove_screenshots, worker_name
+from parallel_runner import close_worker_state, run_job
+from screenshots import SCREENSHOT_DIR, use_screenshot_dir
+
+# Worker daemon for distributed runs.
+# Start one or more on every test machine, pointing at the same queue file:
+#     python worker_daemon.py --queue /mnt/shared/tf_queue.db --browsers 4
+# Each browser slot is a process that claims jobs from the queue, runs them
+# like a parallel_runner worker (warm browsers, login reuse) and pushes the
+# step logs and screenshots back for the Streamlit app to collect.
+
+# Settings that shape a process's session pool and login cache; when a new
+# run changes them the old ones are closed first
+def _state_key(run_options):
+    return (run_options["headless"], run_options["browser"], run_options["persist_logins"], run_options["load_profile"],
+            run_options["browser_contexts"], run_options["recycle_after_runs"], run_options["recycle_above_mb"])
+
+def serve(queue_path, poll=POLL_SECONDS, once=False):
+    queue = JobQueue(queue_path)
+    worker = worker_name()
+    state_key = None
+    # Frames of this slot only, so deleting them can't touch another slot's
+    # (or the app's) screenshots
+    slot_dir = f"{SCREENSHOT_DIR}/{socket.gethostname()}_{os.getpid()}"
+    use_screenshot_dir(slot_dir)
+    print(f"Worker {worker} polling {queue_path}")
+    try:
+        while True:
+            claimed = queue.claim(worker)
+            if claimed is None:
+                if once:
+                    return
+                time.sleep(poll)
+                continue
+            job_id, job, run_options = claimed
+            if _state_key(run_options) != state_key:
+                close_worker_state()
+                state_key = _state_key(run_options)
+            with Heartbeat(queue, job_id, worker):
+                try:
+                    logs = run_job(job, run_options)
+                except Exception as e:
+                    logs = [{"status": f"❌ Error: {e}"}]
+            screenshots = collect_screenshots(logs)
+            if not queue.complete(job_id, worker, logs, screenshots):
+                print(f"Job {job_id} was reassigned before it finished; result dropped")
+            # The queue has the bytes now (or the job went to another worker)
+            remove_screenshots(screenshots)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_worker_state()
+        queue.close()
+        try:
+            os.rmdir(slot_dir)
+        except OSError:
+            pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued test jobs from a shared queue")
+    parser.add_argument("--queue", required=True, help="Path to the shared SQLite queue file")
+    parser.add_argument("--browsers", type=int, default=1, help="Jobs run side by side on this machine")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between polls of an empty queue")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    args = parser.parse_args()
+
+    if args.browsers <= 1:
+        serve(args.queue, poll=args.poll, once=args.once)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        processes = [ctx.Process(target=serve, args=(args.queue, args.poll, args.once)) for _ in range(args.browsers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()